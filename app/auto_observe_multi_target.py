@@ -19,40 +19,19 @@
 
 import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from lib.multi_target_orchestrator import MultiTargetOrchestrator
+# 旧入口保留为兼容壳：实际流程统一由 new_main 执行，避免维护两套编排代码
+from new_main import main as _new_main
 
 
 def main():
-    """主函数"""
-    # 配置文件路径
-    config_file = os.path.join(os.path.dirname(__file__), 'multi_target_config.yaml')
-    
-    # 检查配置文件是否存在
-    if not os.path.exists(config_file):
-        print(f"错误: 配置文件 {config_file} 不存在")
-        print("请创建 multi_target_config.yaml 文件并配置观测参数")
-        return 1
-    
-    try:
-        # 创建多目标观测编排器
-        orchestrator = MultiTargetOrchestrator(config_file)
-        
-        # 运行观测流程
-        orchestrator.run()
-        
-        return 0
-        
-    except KeyboardInterrupt:
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 用户中断脚本执行")
-        return 1
-        
-    except Exception as e:
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 脚本执行出错: {str(e)}")
-        return 1
+    """主函数（使用本目录下的 multi_target_config.yaml，可用 --config 覆盖）"""
+    argv = sys.argv[1:]
+    if not any(arg in ('--config', '-c') or arg.startswith('--config=') for arg in argv):
+        config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'multi_target_config.yaml')
+        sys.argv = [sys.argv[0], '--config', config_file] + argv
+    return _new_main()
 
 
 if __name__ == "__main__":
-    from datetime import datetime
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
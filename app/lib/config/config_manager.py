@@ -3,16 +3,18 @@
 负责配置文件的加载、验证和管理
 """
 
-import sys
+import copy
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
-import yaml
+from bisect import bisect_right
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
+from functools import cached_property
+from operator import attrgetter
 from enum import Enum
 
+from ..utils.observation_utils import ObservationUtils
+
 
 class ConfigValidationError(Exception):
     """配置验证错误"""
@@ -75,6 +77,7 @@ class ACPServerConfig:
 class ScheduleConfig:
     """调度配置"""
     stop_time: Optional[datetime] = None
+    policy: str = 'fcfs'  # 目标调度策略：fcfs（按开始时间顺序）或 greedy_slew（按转动代价贪心选择）
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ScheduleConfig':
@@ -87,13 +90,15 @@ class ScheduleConfig:
             except ValueError:
                 pass
         
-        return cls(stop_time=stop_time)
+        return cls(stop_time=stop_time, policy=data.get('policy', 'fcfs'))
     
     def validate(self) -> List[str]:
         """验证配置"""
         errors = []
         if self.stop_time and self.stop_time < datetime.now():
             errors.append("全局停止时间不能早于当前时间")
+        if self.policy not in ('fcfs', 'greedy_slew'):
+            errors.append(f"不支持的调度策略: {self.policy}（可选 fcfs、greedy_slew）")
         return errors
 
 
@@ -255,10 +260,47 @@ class TargetConfig:
         
         return errors
     
+    @cached_property
+    def start_timestamp(self) -> float:
+        """开始时间的时间戳（秒），首次访问时计算并缓存"""
+        return self.start_time.timestamp()
+    
+    @cached_property
+    def coordinates_deg(self) -> Tuple[float, float]:
+        """(赤经度数, 赤纬度数)，首次访问时解析坐标字符串并缓存（格式错误时抛出 ValueError）"""
+        return ObservationUtils.parse_ra_dec(self.ra, self.dec)
+    
+    @cached_property
+    def ra_hours(self) -> float:
+        """赤经小时数，首次访问时计算并缓存"""
+        return self.coordinates_deg[0] / 15
+    
+    @cached_property
+    def dec_degrees(self) -> float:
+        """赤纬度数，首次访问时计算并缓存"""
+        return self.coordinates_deg[1]
+    
+    @cached_property
+    def total_exposure_seconds(self) -> float:
+        """总曝光时间（秒），首次访问时计算并缓存"""
+        return sum(f['exposure'] * f['count'] for f in self.filters)
+    
+    @cached_property
+    def total_images(self) -> int:
+        """总图像数，首次访问时计算并缓存"""
+        return sum(f['count'] for f in self.filters)
+    
     def get_total_duration_hours(self) -> float:
         """获取总观测时间（小时）"""
-        total_seconds = sum(f['exposure'] * f['count'] for f in self.filters)
-        return total_seconds / 3600
+        return self.total_exposure_seconds / 3600
+
+
+# 进程内已解析配置缓存：绝对路径 -> (修改时间纳秒, 解析字段快照)
+# 快照为深拷贝，存入和取出时各复制一次，各实例之间不共享可变对象；同一路径只保留最新一份
+_PARSED_CONFIGS: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+_PARSED_FIELDS = ('raw_config', 'acp_server', 'schedule', 'meridian_flip', 'observatory',
+                  'global_settings', 'retry_settings', 'targets',
+                  '_timed_targets', '_start_ts', '_total_duration_hours')
 
 
 class MultiTargetConfigManager:
@@ -281,15 +323,45 @@ class MultiTargetConfigManager:
         self.global_settings: Optional[GlobalSettingsConfig] = None
         self.targets: List[TargetConfig] = []
         
-        # 加载配置
-        self._load_config()
-        self._parse_config()
+        # 加载配置（同一文件未修改时复用进程内已解析的结果）
+        cache_key = self._cache_key()
+        cached = _PARSED_CONFIGS.get(cache_key[0]) if cache_key else None
+        if cached is not None and cached[0] == cache_key[1]:
+            # 整体深拷贝快照，保持 targets 与 _timed_targets 引用同一批目标对象
+            self.__dict__.update(copy.deepcopy(cached[1]))
+        else:
+            self._load_config()
+            self._parse_config()
+            self._store_parsed(cache_key)
+    
+    def _cache_key(self) -> Optional[tuple]:
+        """解析结果缓存键：(绝对路径, 修改时间纳秒)，文件不存在时返回None"""
+        try:
+            return (os.path.abspath(self.config_file), os.stat(self.config_file).st_mtime_ns)
+        except OSError:
+            return None
+    
+    def _parsed_fields(self) -> Dict[str, Any]:
+        """当前实例的全部解析结果字段"""
+        return {name: getattr(self, name) for name in _PARSED_FIELDS}
+    
+    def _store_parsed(self, cache_key: Optional[tuple]):
+        """将解析结果的深拷贝存入进程内缓存（覆盖同一路径的旧版本）"""
+        if cache_key is None:
+            return
+        path, mtime_ns = cache_key
+        _PARSED_CONFIGS[path] = (mtime_ns, copy.deepcopy(self._parsed_fields()))
     
     def _load_config(self):
         """加载配置文件"""
+        # yaml 只在真正读取配置文件时导入（命中进程内解析缓存时不加载）
+        import yaml
+        # 优先使用 libyaml 的 C 实现加载器，未编译 libyaml 时回退到纯 Python 实现
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                self.raw_config = yaml.safe_load(f)
+                self.raw_config = yaml.load(f, Loader=loader)
         except FileNotFoundError:
             raise ConfigValidationError(f"配置文件不存在: {self.config_file}")
         except yaml.YAMLError as e:
@@ -327,7 +399,27 @@ class MultiTargetConfigManager:
             self.targets.append(TargetConfig.from_dict(target_data))
         
         # 按开始时间和优先级排序
-        self.targets.sort(key=lambda x: (x.start_time, x.priority))
+        self.targets.sort(key=attrgetter('start_time', 'priority'))
+        
+        # 有开始时间的目标及其时间戳（有序），供二分查找当前/下一个目标
+        self._timed_targets = [t for t in self.targets if t.start_time]
+        self._start_ts = [t.start_timestamp for t in self._timed_targets]
+        
+        # 目标配置加载后不再变化，总观测时间解析时计算一次
+        self._total_duration_hours = sum(t.total_exposure_seconds for t in self.targets) / 3600
+    
+    def reload(self):
+        """重新加载并解析配置文件（解析失败时保留原配置并抛出异常）"""
+        saved = self._parsed_fields()
+        try:
+            cache_key = self._cache_key()
+            self._load_config()
+            self._parse_config()
+            self._store_parsed(cache_key)
+        except Exception:
+            # 原样恢复全部解析字段，不重新解析
+            self.__dict__.update(saved)
+            raise
     
     def validate(self) -> List[str]:
         """验证所有配置
@@ -374,17 +466,43 @@ class MultiTargetConfigManager:
         """
         return len(self.validate()) == 0
     
+    def get_current_target(self, current_time: Optional[datetime] = None) -> Optional[TargetConfig]:
+        """获取当前时间所处的目标（开始时间不晚于当前时间的最后一个目标）
+        
+        Args:
+            current_time: 当前时间（默认为now）
+            
+        Returns:
+            当前目标，尚无目标开始时返回None
+        """
+        if current_time is None:
+            current_time = datetime.now()
+        idx = bisect_right(self._start_ts, current_time.timestamp()) - 1
+        return self._timed_targets[idx] if idx >= 0 else None
+    
+    def get_next_target(self, current_time: Optional[datetime] = None) -> Optional[TargetConfig]:
+        """获取下一个尚未开始的目标
+        
+        Args:
+            current_time: 当前时间（默认为now）
+            
+        Returns:
+            下一个目标，没有时返回None
+        """
+        if current_time is None:
+            current_time = datetime.now()
+        idx = bisect_right(self._start_ts, current_time.timestamp())
+        return self._timed_targets[idx] if idx < len(self._timed_targets) else None
+    
     def get_summary(self) -> Dict[str, Any]:
         """获取配置摘要
         
         Returns:
             摘要信息字典
         """
-        total_duration = sum(target.get_total_duration_hours() for target in self.targets)
-        
         return {
             'total_targets': len(self.targets),
-            'total_duration_hours': total_duration,
+            'total_duration_hours': self._total_duration_hours,
             'dryrun_mode': self.global_settings.dryrun if self.global_settings else False,
             'has_meridian_flip': self.meridian_flip is not None,
             'has_observatory': self.observatory is not None,
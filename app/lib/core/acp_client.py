@@ -2,6 +2,7 @@
 # 提供与ACP天文台控制软件的HTTP接口交互
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup as bs
@@ -60,6 +61,7 @@ class ACPClient:
             max_retries: int = 3,
             retry_delay: float = 1.0,
             retry_interval_seconds: int = 60,  # 新增：重试间隔时间（秒）
+            session: Optional[requests.Session] = None,
             ):
         self.base_url = base_url
         self.user = user
@@ -70,7 +72,14 @@ class ACPClient:
         self.retry_delay = retry_delay
         self.retry_interval_seconds = retry_interval_seconds  # 新增：重试间隔时间
         
-        self.session = requests.Session()
+        # 允许注入外部会话；自建会话时挂载小连接池，状态轮询与计划启动/停止复用同一条keep-alive连接
+        # （重试由本类各方法自行处理，适配器不再额外重试）
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
         self._setup_session()
         
     def _setup_session(self):
@@ -96,11 +105,15 @@ class ACPClient:
                 self.title = title_tags[0].text
             else:
                 self.title = "ACP Observatory"
-            logger.info(f"登录成功，标题: {self.title}")
+            logger.info("登录成功，标题: %s", self.title)
         except Exception as e:
-            logger.warning(f"连接测试失败，但会话已配置: {e}")
+            logger.warning("连接测试失败，但会话已配置: %s", e)
             self.title = "ACP Observatory"
     
+    def close(self):
+        """关闭会话连接池，释放保持的keep-alive连接（之后再发请求会自动重建连接）"""
+        self.session.close()
+    
     def _make_url(self, endpoint: str) -> str:
         """构建完整URL"""
         return urljoin(self.base_url, endpoint)
@@ -123,7 +136,7 @@ class ACPClient:
                 return status
                 
             except requests.RequestException as e:
-                logger.error(f"获取系统状态失败: {e}, 尝试次数: {attempt + 1}")
+                logger.error("获取系统状态失败: %s, 尝试次数: %d", e, attempt + 1)
                 # 使用配置文件中的重试间隔，采用递增策略
                 base_interval = self.retry_interval_seconds
                 delay = min(base_interval + attempt * 2, base_interval * 2)  # 递增但不超过基础间隔的2倍
@@ -161,10 +174,10 @@ class ACPClient:
             # 检查警告信息
             warnings = self.get_observatory_warnings(response_text)
             if warnings:
-                logger.warning(f"观测警告: {'; '.join(warnings)}")
+                logger.warning("观测警告: %s", '; '.join(warnings))
                 
         except Exception as e:
-            logger.warning(f"解析状态响应时出错: {e}")
+            logger.warning("解析状态响应时出错: %s", e)
             
         return status
     
@@ -198,20 +211,20 @@ class ACPClient:
                 )
                 response.raise_for_status()
                 
-                logger.info(f"成像计划提交响应: {response.text}")
+                logger.info("成像计划提交响应: %s", response.text)
                 
                 # 检查是否有警告信息
                 if "warning" in response.text.lower():
                     warnings = self.get_observatory_warnings(response.text)
                     error_msg = "; ".join(warnings) if warnings else "观测计划启动出现警告"
-                    logger.warning(f"成像计划启动警告: {error_msg}")
+                    logger.warning("成像计划启动警告: %s", error_msg)
                     return False, error_msg
                 
                 return True, ""
                 
             except requests.RequestException as e:
                 error_msg = f"启动成像计划失败: {e}"
-                logger.error(f"{error_msg}, 尝试次数: {attempt + 1}")
+                logger.error("%s, 尝试次数: %d", error_msg, attempt + 1)
                 # 使用配置文件中的重试间隔，采用递增策略
                 base_interval = self.retry_interval_seconds
                 delay = min(base_interval + attempt * 5, base_interval * 3)  # 递增但不超过基础间隔的3倍
@@ -321,11 +334,11 @@ class ACPClient:
                     logger.info("天文台已准备就绪")
                     return True
                 
-                logger.info(f"等待天文台准备就绪... 当前状态: {status.observatory_status}")
+                logger.info("等待天文台准备就绪... 当前状态: %s", status.observatory_status)
                 time.sleep(check_interval)
                 
             except Exception as e:
-                logger.error(f"检查天文台状态时出错: {e}")
+                logger.error("检查天文台状态时出错: %s", e)
                 time.sleep(check_interval)
         
         logger.error("等待天文台准备就绪超时")
@@ -422,6 +435,28 @@ class ACPClient:
             
         return form_data
     
+    def is_observatory_free(self) -> Optional[bool]:
+        """
+        单次查询天文台是否空闲（无脚本占用），不做重试，供停止后的就绪轮询使用
+        
+        Returns:
+            True: 空闲；False: 仍被占用；None: 查询失败，状态未知
+        """
+        try:
+            response = self.session.post(
+                self._make_url('/ac/asystemstatus.asp'),
+                data="",
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            return None
+        
+        owner = self.parse_encoded_status_text(response.text).get('sm_obsOwner')
+        if not owner:
+            return None
+        return owner.strip().lower() == 'free'
+    
     def stop_script(self) -> bool:
         """
         停止当前运行的脚本
@@ -435,11 +470,11 @@ class ACPClient:
                 )
                 response.raise_for_status()
                 
-                logger.info(f"停止脚本响应: {response.text}")
+                logger.info("停止脚本响应: %s", response.text)
                 return "Received" in response.text
                 
             except requests.RequestException as e:
-                logger.error(f"停止脚本失败: {e}, 尝试次数: {attempt + 1}")
+                logger.error("停止脚本失败: %s, 尝试次数: %d", e, attempt + 1)
                 # 使用配置文件中的重试间隔，采用递增策略
                 base_interval = self.retry_interval_seconds
                 delay = min(base_interval + attempt * 5, base_interval * 3)  # 递增但不超过基础间隔的3倍
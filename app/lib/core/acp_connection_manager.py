@@ -3,14 +3,41 @@ ACP客户端连接管理器
 负责与ACP服务器的连接和基础通信
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
+import threading
 import time
 from datetime import datetime
-from typing import Optional, Dict, Any
-from .acp_client import ACPClient
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+if TYPE_CHECKING:
+    # ACP客户端依赖 requests/bs4，仅在真正连接时导入（DRYRUN 和 --help 不加载）
+    from .acp_client import ACPClient
+
+
+@lru_cache(maxsize=4)
+def _get_client(server_url: str, username: str, password: str,
+                max_retries: int, retry_interval_seconds: int) -> 'ACPClient':
+    """获取ACP客户端（同一进程内相同参数复用已建立的会话，避免重复登录和TCP握手）
+    
+    Args:
+        server_url: ACP服务器URL
+        username: 用户名
+        password: 密码
+        max_retries: 最大重试次数
+        retry_interval_seconds: 重试间隔时间（秒）
+        
+    Returns:
+        ACP客户端
+    """
+    from .acp_client import ACPClient
+    
+    return ACPClient(
+        server_url,
+        username,
+        password,
+        max_retries=max_retries,
+        retry_interval_seconds=retry_interval_seconds
+    )
 
 
 class ACPConnectionManager:
@@ -33,8 +60,22 @@ class ACPConnectionManager:
         self.dryrun = dryrun
         self.max_retries = max_retries
         self.retry_interval_seconds = retry_interval_seconds
-        self.client: Optional[ACPClient] = None
+        self.client: Optional['ACPClient'] = None
         self.is_connected = False
+        # 中断事件：interrupt_wait() 置位后立即结束停止操作后的等待
+        self._wait_interrupted = threading.Event()
+        # 状态缓存：min_poll_interval_s 内的重复查询直接返回上次结果，并发查询由锁合并为一次请求
+        self.min_poll_interval_s = 2.0
+        self._status_cache: Optional[Dict[str, Any]] = None
+        self._status_ts = 0.0
+        self._status_lock = threading.Lock()
+    
+    def interrupt_wait(self):
+        """中断 stop_current_operation 中的等待（可从信号处理器或其他线程调用）
+        
+        中断状态保持到下一次 connect()，期间的停止操作不再等待天文台空闲。
+        """
+        self._wait_interrupted.set()
     
     def connect(self) -> bool:
         """连接到ACP服务器
@@ -43,6 +84,9 @@ class ACPConnectionManager:
             True: 连接成功
             False: 连接失败
         """
+        # 新的连接会话开始，清除上一会话遗留的等待中断状态
+        self._wait_interrupted.clear()
+        
         if self.dryrun:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 模拟连接到ACP服务器...")
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] [OK] 模拟连接成功")
@@ -52,12 +96,12 @@ class ACPConnectionManager:
         
         try:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] 正在连接到ACP服务器...")
-            self.client = ACPClient(
-                self.server_url, 
-                self.username, 
-                self.password, 
-                max_retries=self.max_retries,
-                retry_interval_seconds=self.retry_interval_seconds
+            self.client = _get_client(
+                self.server_url,
+                self.username,
+                self.password,
+                self.max_retries,
+                self.retry_interval_seconds
             )
             self.is_connected = True
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [OK] 成功连接到ACP服务器")
@@ -82,9 +126,11 @@ class ACPConnectionManager:
         
         try:
             if self.client:
-                # ACPClient没有显式的disconnect方法
+                # 释放连接池中的keep-alive连接；客户端对象仍由 _get_client 缓存，重新连接时复用
+                self.client.close()
                 self.client = None
             self.is_connected = False
+            self.invalidate_status()
             return True
         except Exception as e:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] 断开连接时出错: {e}")
@@ -108,16 +154,39 @@ class ACPConnectionManager:
         if not self.client or not self.is_connected:
             return {'connected': False, 'error': '未连接'}
         
-        try:
-            return {
-                'connected': True,
-                'is_running': self.client.IsRunning,
-                'target_name': self.client.TargetName if hasattr(self.client, 'TargetName') else 'Unknown',
-                'filter': self.client.Filter if hasattr(self.client, 'Filter') else 'Unknown',
-                'status': 'running' if self.client.IsRunning else 'idle'
-            }
-        except Exception as e:
-            return {'connected': True, 'error': str(e)}
+        with self._status_lock:
+            # 持锁期间其他线程等待本次查询完成后直接复用结果
+            if self._status_cache is not None and time.monotonic() - self._status_ts < self.min_poll_interval_s:
+                return dict(self._status_cache)
+            
+            try:
+                # 一次系统状态请求同时得到占用者和当前滤镜
+                obs = self.client.get_system_status()
+                if not obs.local_time:
+                    # 重试耗尽或响应无法解析时客户端返回默认状态（服务器总会返回本地时间）
+                    status = {'connected': True, 'error': '无法获取天文台状态'}
+                else:
+                    # 天文台被脚本占用（占用者不是 Free）即视为计划正在运行
+                    is_running = obs.owner.strip().lower() != 'free'
+                    status = {
+                        'connected': True,
+                        'is_running': is_running,
+                        'owner': obs.owner,
+                        'filter': obs.image_filter or 'Unknown',
+                        'plan_progress': obs.plan_progress,
+                        'status': 'running' if is_running else 'idle'
+                    }
+            except Exception as e:
+                status = {'connected': True, 'error': str(e)}
+            
+            # 出错结果同样缓存，服务器异常时并发和连续查询也不会重复请求
+            self._status_cache = status
+            self._status_ts = time.monotonic()
+            return dict(status)
+    
+    def invalidate_status(self):
+        """清除状态缓存（发出启动/停止等改变状态的命令后调用，下次查询直接请求服务器）"""
+        self._status_cache = None
     
     def stop_current_operation(self, wait_seconds: int = 60) -> bool:
         """停止当前操作
@@ -131,7 +200,6 @@ class ACPConnectionManager:
         """
         if self.dryrun:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 模拟停止当前操作...")
-            time.sleep(1)  # 模拟等待
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] [OK] 模拟停止成功")
             return True
         
@@ -142,7 +210,19 @@ class ACPConnectionManager:
         try:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] 正在停止当前操作...")
             success = self.client.stop_script()
-            time.sleep(wait_seconds)
+            self.invalidate_status()
+            # 等待ACP完成停止：按指数退避轮询空闲状态，空闲或收到中断请求时提前返回，最多等待 wait_seconds
+            deadline = time.monotonic() + wait_seconds
+            delay = 0.1
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._wait_interrupted.wait(timeout=min(delay, remaining)):
+                    break
+                if self.client.is_observatory_free():
+                    break
+                delay = min(delay * 2, 1.0)
             
             # if success:
             #     print(f"[{datetime.now().strftime('%H:%M:%S')}] [OK] 当前操作已停止")
@@ -4,14 +4,32 @@ ACP成像计划管理器
 """
 
 import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from .acp_connection_manager import ACPConnectionManager
 
 
+# 后台执行停止操作的单线程执行器，使远程停止等待与计划构建重叠
+_STOP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='acp-stop')
+
+# 计划摘要分隔线
+_SEP70 = '=' * 70
+
+
+@lru_cache(maxsize=None)
+def _get_plan_cls():
+    """获取 ImagingPlan 类（ACP客户端依赖 requests/bs4，首次真实启动计划时导入一次，之后直接复用）
+    
+    Returns:
+        ImagingPlan 类
+    """
+    from .acp_client import ImagingPlan
+    
+    return ImagingPlan
+
+
 class ACPImagingManager:
     """ACP成像计划管理器 - 负责成像计划的创建、启动和管理"""
     
@@ -45,11 +63,20 @@ class ACPImagingManager:
             'af_interval': config.get('af_interval', 120)
         }
         
-        # 计算预计完成时间
-        total_exposure_time = sum(f['exposure'] * f['count'] for f in plan['filters'])
-        estimated_duration = timedelta(seconds=total_exposure_time * 1.2)  # 增加20%缓冲时间
+        # 计算预计完成时间（TargetConfig 已缓存总曝光时间和总图像数，其他目标对象现算）
+        total_exposure_time = getattr(target, 'total_exposure_seconds', None)
+        if total_exposure_time is None:
+            total_exposure_time = sum(f['exposure'] * f['count'] for f in plan['filters'])
+        total_images = getattr(target, 'total_images', None)
+        if total_images is None:
+            total_images = sum(f['count'] for f in plan['filters'])
+        estimated_duration_seconds = float(total_exposure_time * 1.2)  # 增加20%缓冲时间
+        estimated_duration = timedelta(seconds=estimated_duration_seconds)
         
         plan['estimated_duration'] = estimated_duration
+        plan['estimated_duration_seconds'] = estimated_duration_seconds
+        plan['total_exposure_seconds'] = total_exposure_time
+        plan['total_images'] = total_images
         plan['estimated_finish_time'] = datetime.now() + estimated_duration
         
         return plan
@@ -68,11 +95,37 @@ class ACPImagingManager:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
             return False, error_msg
 
-        # 停止当前计划（确保干净启动）
-        self.connection_manager.stop_current_operation(wait_seconds=60)
+        # 停止当前计划（确保干净启动），在后台线程执行以便与计划构建重叠
+        stop_future = _STOP_EXECUTOR.submit(
+            self.connection_manager.stop_current_operation, wait_seconds=60
+        )
+
+        imaging_plan = None
+        if not self.connection_manager.dryrun:
+            try:
+                # 将字典转换为ImagingPlan对象（ACP客户端模块仅在非 DRYRUN 时导入）
+                imaging_plan = _get_plan_cls()(
+                    target=plan['target_name'],
+                    ra=plan['ra'],
+                    dec=plan['dec'],
+                    filters=plan.get('filters', []),
+                    dither=plan.get('dither', 5),
+                    auto_focus=plan.get('auto_focus', True),
+                    periodic_af_interval=plan.get('af_interval', 120)
+                )
+            except Exception as e:
+                stop_future.result()
+                error_msg = f"启动成像计划时出错: {e}"
+                return False, error_msg
+
+        # 等待停止操作完成后再启动新计划
+        stop_future.result()
 
+        # 启动时刻只取一次：计划开始时间和摘要中的预计完成时间共用
+        now = datetime.now()
         self.current_plan = plan
-        self.plan_start_time = datetime.now()
+        self.plan_start_time = now
+        plan['estimated_finish_time'] = now + plan['estimated_duration']
 
         if self.connection_manager.dryrun:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 模拟启动成像计划...")
@@ -89,19 +142,8 @@ class ACPImagingManager:
                 error_msg = "ACP客户端无效"
                 return False, error_msg
 
-            # 将字典转换为ImagingPlan对象
-            from .acp_client import ImagingPlan
-            imaging_plan = ImagingPlan(
-                target=plan['target_name'],
-                ra=plan['ra'],
-                dec=plan['dec'],
-                filters=plan.get('filters', []),
-                dither=plan.get('dither', 5),
-                auto_focus=plan.get('auto_focus', True),
-                periodic_af_interval=plan.get('af_interval', 120)
-            )
-
             success, error_message = client.start_imaging_plan(imaging_plan)
+            self.connection_manager.invalidate_status()
 
             if success:
                 # print(f"[{datetime.now().strftime('%H:%M:%S')}] [OK] 成像计划启动成功！")
@@ -117,16 +159,19 @@ class ACPImagingManager:
             # print(f"[{datetime.now().strftime('%H:%M:%S')}] [ERROR] {error_msg}")
             return False, error_msg
     
-    def get_current_plan_status(self) -> Dict[str, Any]:
+    def get_current_plan_status(self, acp_status: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """获取当前成像计划状态
         
+        Args:
+            acp_status: 调用方本轮已获取的ACP状态，传入时不再重复请求ACP服务器
+        
         Returns:
             状态字典
         """
         if not self.current_plan:
             return {'has_plan': False}
         
-        status = self.connection_manager.get_status()
+        status = acp_status if acp_status is not None else self.connection_manager.get_status()
         elapsed_time = datetime.now() - self.plan_start_time if self.plan_start_time else timedelta(0)
         
         return {
@@ -163,28 +208,29 @@ class ACPImagingManager:
         """
         prefix = "[DRYRUN] 模拟" if is_dryrun else ""
         
-        print(f"\n{'='*70}")
-        print(f"{prefix}成像计划已启动！")
-        print(f"目标: {plan['target_name']}")
-        print(f"坐标: RA {plan['ra']}, DEC {plan['dec']}")
-        
-        # 计算总图像数和曝光时间
-        total_images = sum(f['count'] for f in plan['filters'])
-        total_exposure = sum(f['exposure'] * f['count'] for f in plan['filters'])
-        
-        print(f"总图像数: {total_images}张")
-        print(f"总曝光时间: {total_exposure}秒 ({total_exposure/3600:.1f}小时)")
-        print(f"预计完成时间: {plan['estimated_finish_time'].strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        print(f"滤镜配置:")
-        for i, filter_cfg in enumerate(plan['filters'], 1):
-            filter_name = filter_cfg.get('name', f"Filter {filter_cfg['filter_id']}")
-            print(f"  {i}. {filter_name}: {filter_cfg['exposure']}秒 x {filter_cfg['count']}张")
-        
-        print(f"其他设置:")
-        print(f"  抖动: {plan['dither']}像素")
-        print(f"  自动对焦: {'开启' if plan['auto_focus'] else '关闭'}")
+        # 总图像数和曝光时间在创建计划时已计算
+        total_images = plan['total_images']
+        total_exposure = plan['total_exposure_seconds']
+        
+        lines = [
+            "\n" + _SEP70,
+            f"{prefix}成像计划已启动！",
+            f"目标: {plan['target_name']}",
+            f"坐标: RA {plan['ra']}, DEC {plan['dec']}",
+            f"总图像数: {total_images}张",
+            f"总曝光时间: {total_exposure}秒 ({total_exposure/3600:.1f}小时)",
+            f"预计完成时间: {plan['estimated_finish_time'].strftime('%Y-%m-%d %H:%M:%S')}",
+            "滤镜配置:",
+        ]
+        for i, cfg in enumerate(plan['filters'], 1):
+            filter_name = cfg.get('name') or f"Filter {cfg['filter_id']}"
+            lines.append(f"  {i}. {filter_name}: {cfg['exposure']}秒 x {cfg['count']}张")
+        lines.append("其他设置:")
+        lines.append(f"  抖动: {plan['dither']}像素")
+        lines.append(f"  自动对焦: {'开启' if plan['auto_focus'] else '关闭'}")
         if plan['auto_focus']:
-            print(f"  对焦间隔: {plan['af_interval']}张")
+            lines.append(f"  对焦间隔: {plan['af_interval']}张")
+        lines.append(_SEP70)
         
-        print(f"{'='*70}")
\ No newline at end of file
+        # 一次写出整个摘要
+        sys.stdout.write("\n".join(lines) + "\n")
@@ -3,12 +3,12 @@
 负责单个目标的观测执行和监控
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
+import functools
+import logging
+import re
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, time as dt_time
 from typing import Dict, Any, Optional, Callable
 from ..core.acp_imaging_manager import ACPImagingManager
 from ..core.acp_connection_manager import ACPConnectionManager
@@ -18,6 +18,60 @@ from ..utils.log_manager import LogManager
 from ..meridian_flip_manager import MeridianFlipManager
 
 
+# 状态行时间戳前缀模板（每次轮询只格式化一次时间戳）
+_LOG_PREFIX = "[{ts}] "
+
+# 监控开始分隔线
+_SEP60 = '=' * 60
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_meridian_dt(meridian_time: str, day: date) -> datetime:
+    """将手动指定的中天时间解析为指定日期的datetime（按时间字符串和日期缓存）
+    
+    Args:
+        meridian_time: 中天时间字符串，格式为 'HH:MM:SS'
+        day: 观测日期
+        
+    Returns:
+        中天时间
+    """
+    # 格式固定，直接拆分为整数，避免 strptime 的开销
+    h, m, s = map(int, meridian_time.split(':'))
+    return datetime.combine(day, dt_time(h, m, s))
+
+
+# 错误分类正则：每个分支用前瞻断言表达“同时包含”的关键词，re.match 从开头按分支顺序尝试，
+# 因此保持原有的优先级，并且关键词出现的先后顺序不影响匹配
+_ERR_RE = re.compile(
+    r'(?P<authentication_failed>(?=.*(?:401|access denied|invalid login)))'
+    r'|(?P<connection_timeout>(?=.*connection)(?=.*timeout))'
+    r'|(?P<acp_server_error>(?=.*acp)(?=.*server))'
+    r'|(?P<observatory_offline>(?=.*observatory)(?=.*offline))'
+    r'|(?P<meridian_flip_failed>(?=.*meridian)(?=.*flip))'
+    r'|(?P<observation_timeout>(?=.*observation)(?=.*timeout))'
+    r'|(?P<imaging_plan_failed>(?=.*imaging)(?=.*plan))'
+    r'|(?P<status_check_failed>(?=.*status)(?=.*check))'
+    r'|(?P<telescope_error>(?=.*telescope)(?=.*(?:not responding|error)))'
+    r'|(?P<camera_error>(?=.*camera)(?=.*(?:error|not found)))',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _classify_error(message: str) -> str:
+    """对错误信息分类（ACP常返回相同错误信息，结果缓存）
+    
+    Args:
+        message: 错误信息
+        
+    Returns:
+        错误类型
+    """
+    m = _ERR_RE.match(message)
+    return m.lastgroup if m else 'unknown_error'
+
+
 class TargetObservationExecutor:
     """目标观测执行器 - 负责单个目标的观测执行和监控"""
     
@@ -37,25 +91,54 @@ class TargetObservationExecutor:
         self.imaging_manager = imaging_manager
         self.log_manager = log_manager
         self.dryrun = dryrun
+        self._dryrun_prefix = '[DRYRUN] ' if dryrun else ''
         self.current_target: Optional[Dict[str, Any]] = None
         self.observation_start_time: Optional[datetime] = None
+        self._observation_start_mono: Optional[float] = None
         self.status_callbacks: list[Callable] = []
+        # 观测状态缓冲区：每次轮询原地更新，避免重复分配状态字典
+        self._status_buf: Dict[str, Any] = {}
         self.meridian_manager: Optional[MeridianFlipManager] = None
+        # 中天反转检查结果缓存：(id(target), 分钟) -> (monotonic时间戳, 检查结果)
+        self._meridian_cache: Dict[tuple, tuple] = {}
+        self._meridian_cache_ttl = 60  # 秒
+        # 中天时间缓存：(ra, dec, 日期) -> 中天时间
+        self._meridian_time_cache: Dict[tuple, Optional[datetime]] = {}
         self.retry_config: Dict[str, Any] = {
             'enabled': True,
             'max_attempts': 5,  # 减少默认重试次数
             'retry_interval_seconds': 180,  # 增加默认重试间隔
             'retry_on_errors': ['connection_timeout', 'acp_server_error', 'meridian_flip_failed', 'observation_timeout']
         }
+        self._retry_on_errors_set: frozenset = frozenset()
+        self._retry_schedule: tuple = ()
+        self._rebuild_retry_plan()
+        # 自适应轮询：状态无变化时逐步拉长间隔，状态变化或接近完成时恢复最小间隔
+        self._poll_min = 5  # 最小轮询间隔（秒）
+        self._poll_max = 30  # 最大轮询间隔（秒），ACP 无推送通知，完成检测延迟不超过该值
+        self._poll_interval = self._poll_min
+        # 获取状态失败时的重试间隔按指数增长
+        self._err_min = 1
+        self._err_max = 60
+        self._err_interval = self._err_min
+        
+        # 取消事件：cancel() 置位后立即中断重试等待和监控等待
+        self._cancel_event = threading.Event()
+        self.monitor_safety_factor = 1.5  # 监控超时 = 计划预计时长 x 安全系数
     
     def add_status_callback(self, callback: Callable):
         """添加状态回调函数
         
         Args:
-            callback: 回调函数，接收状态字典
+            callback: 回调函数，接收状态字典（字典在轮询间复用，需要保留时请自行复制）
         """
         self.status_callbacks.append(callback)
     
+    def cancel(self):
+        """取消当前目标的观测（中断重试等待和监控循环，可从其他线程调用）"""
+        self.log_manager.event("收到取消请求，正在中断当前目标观测", level='warning')
+        self._cancel_event.set()
+    
     def set_retry_config(self, retry_config: Dict[str, Any]):
         """设置重试配置
         
@@ -63,7 +146,17 @@ class TargetObservationExecutor:
             retry_config: 重试配置字典
         """
         self.retry_config.update(retry_config)
-        self.log_manager.info(f"重试配置已更新: {retry_config}")
+        self._rebuild_retry_plan()
+        self.log_manager.info("重试配置已更新: %s", retry_config)
+    
+    def _rebuild_retry_plan(self):
+        """根据重试配置预先计算可重试错误集合和各次重试的等待时间（按 1.3 倍退避，上限1小时）"""
+        max_attempts = self.retry_config.get('max_attempts', 3)
+        retry_interval = self.retry_config.get('retry_interval_seconds', 300)
+        self._retry_on_errors_set = frozenset(self.retry_config.get('retry_on_errors', []))
+        self._retry_schedule = tuple(
+            min(retry_interval * (1.3 ** i), 3600) for i in range(max(max_attempts - 1, 0))
+        )
     
     def set_meridian_manager(self, meridian_manager: MeridianFlipManager):
         """设置中天管理器
@@ -72,6 +165,8 @@ class TargetObservationExecutor:
             meridian_manager: 中天反转管理器
         """
         self.meridian_manager = meridian_manager
+        self._meridian_cache.clear()
+        self._meridian_time_cache.clear()
     
     def execute_target(self, target: Any, global_config: Dict[str, Any]) -> bool:
         """执行目标观测（支持重试）
@@ -86,27 +181,31 @@ class TargetObservationExecutor:
         """
         target_name = target.name
         current_time = datetime.now()
-        # print(f"\n[{current_time.strftime('%H:%M:%S')}] {'[DRYRUN] ' if self.dryrun else ''}开始执行 {target_name} 观测任务")
-        self.log_manager.info(f"{'[DRYRUN] ' if self.dryrun else ''}开始执行 {target_name} 观测任务")
+        self.log_manager.event("%s开始执行 %s 观测任务", self._dryrun_prefix, target_name)
+        
+        # 清除上一个目标的中天反转检查缓存和取消状态
+        self._meridian_cache.clear()
+        self._cancel_event.clear()
         
         # 获取重试配置
         retry_enabled = self.retry_config.get('enabled', True)
-        max_attempts = self.retry_config.get('max_attempts', 3)
-        retry_interval = self.retry_config.get('retry_interval_seconds', 300)
-        retry_on_errors = self.retry_config.get('retry_on_errors', [])
+        # 尝试次数取自预先计算的重试计划，避免 retry_config 被直接修改后与计划长度不一致
+        max_attempts = len(self._retry_schedule) + 1
+        retry_on_errors = self._retry_on_errors_set
         
         for attempt in range(1, max_attempts + 1):
             if attempt > 1:
-                # print(f"\n[{current_time.strftime('%H:%M:%S')}] 🔄 第 {attempt}/{max_attempts} 次重试，等待 {retry_interval} 秒...")
-                self.log_manager.info(f"第 {attempt}/{max_attempts} 次重试，等待 {retry_interval} 秒")
-                time.sleep(retry_interval)
+                retry_interval = self._retry_schedule[attempt - 2]
+                self.log_manager.event("第 %d/%d 次重试，等待 %.0f 秒", attempt, max_attempts, retry_interval)
+                if self._cancel_event.wait(timeout=retry_interval):
+                    self.log_manager.event("%s 重试等待被取消", target_name, level='warning')
+                    return False
                 current_time = datetime.now()
             
             success = self._execute_target_attempt(target, global_config, attempt)
             
             if success:
-                # print(f"[{current_time.strftime('%H:%M:%S')}] ✅ {target_name} 观测成功")
-                self.log_manager.info(f"{target_name} 观测成功")
+                self.log_manager.event("%s 观测成功", target_name)
                 return True
             
             # 检查是否需要重试
@@ -118,11 +217,10 @@ class TargetObservationExecutor:
             if last_error and retry_on_errors:
                 error_type = self._get_error_type(last_error)
                 if error_type not in retry_on_errors:
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] ❌ 错误类型 '{error_type}' 不支持重试")
+                    self.log_manager.event("错误类型 '%s' 不支持重试", error_type, level='warning')
                     break
         
-        # print(f"[{current_time.strftime('%H:%M:%S')}] ❌ {target_name} 观测失败（重试{max_attempts}次后）")
-        self.log_manager.error(f"{target_name} 观测失败（重试{max_attempts}次后）")
+        self.log_manager.event("%s 观测失败（重试%d次后）", target_name, max_attempts, level='error')
         return False
     
     def _execute_target_attempt(self, target: Any, global_config: Dict[str, Any], attempt: int) -> bool:
@@ -144,39 +242,39 @@ class TargetObservationExecutor:
         
         # 显示尝试次数信息
         if attempt > 1:
-            # print(f"[{current_time.strftime('%H:%M:%S')}] 🔄 第 {attempt} 次尝试执行 {target_name}")
-            self.log_manager.info(f"第 {attempt} 次尝试执行 {target_name}")
+            self.log_manager.event("第 %d 次尝试执行 %s", attempt, target_name)
         
         # 显示中天时间（如果中天管理器可用）
         if self.meridian_manager:
             try:
                 # 检查是否有手动指定的中天时间
-                if hasattr(target, 'meridian_time') and target.meridian_time:
+                manual_meridian = getattr(target, 'meridian_time', None)
+                if manual_meridian:
                     # 使用手动指定的中天时间
-                    today = current_time.date()
-                    meridian_time_str = f"{today} {target.meridian_time}"
-                    meridian_time = datetime.strptime(meridian_time_str, '%Y-%m-%d %H:%M:%S')
-                    meridian_str = target.meridian_time
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] 🌟 {target_name} 中天时间: {meridian_str} (手动指定)")
-                    self.log_manager.info(f"{target_name} 中天时间: {meridian_str} (手动指定)")
+                    meridian_time = _resolve_meridian_dt(manual_meridian, current_time.date())
+                    meridian_str = manual_meridian
+                    self.log_manager.event("%s 中天时间: %s (手动指定)", target_name, meridian_str)
                 else:
-                    # 自动计算中天时间
-                    meridian_time = self.meridian_manager.calculate_meridian_time(
-                        target.ra, target.dec, current_time
-                    )
+                    # 自动计算中天时间（中天时间只取决于日期，同一天内缓存）
+                    cache_key = (target.ra, target.dec, current_time.date())
+                    if cache_key in self._meridian_time_cache:
+                        meridian_time = self._meridian_time_cache[cache_key]
+                    else:
+                        meridian_time = self.meridian_manager.calculate_meridian_time_numeric(
+                            target.ra_hours, target.dec_degrees, current_time
+                        )
+                        self._meridian_time_cache[cache_key] = meridian_time
                     if meridian_time:
                         meridian_str = meridian_time.strftime('%H:%M:%S')
-                        # print(f"[{current_time.strftime('%H:%M:%S')}] 🌟 {target_name} 中天时间: {meridian_str}")
-                        self.log_manager.info(f"{target_name} 中天时间: {meridian_str}")
+                        self.log_manager.event("%s 中天时间: %s", target_name, meridian_str)
                     else:
-                        # print(f"[{current_time.strftime('%H:%M:%S')}] ⚠️ 无法计算 {target_name} 的中天时间")
-                        self.log_manager.warning(f"无法计算 {target_name} 的中天时间")
+                        self.log_manager.event("无法计算 %s 的中天时间", target_name, level='warning')
             except Exception as e:
-                # print(f"[{current_time.strftime('%H:%M:%S')}] ⚠️ 计算中天时间出错: {str(e)}")
-                self.log_manager.warning(f"计算 {target_name} 中天时间出错: {str(e)}")
+                self.log_manager.event("计算 %s 中天时间出错: %s", target_name, e, level='warning')
         
         self.current_target = target
         self.observation_start_time = datetime.now()
+        self._observation_start_mono = time.monotonic()
         
         try:
             # 创建成像计划
@@ -186,8 +284,7 @@ class TargetObservationExecutor:
             success, error_msg = self.imaging_manager.start_imaging_plan(plan)
             
             if success:
-                # print(f"[{datetime.now().strftime('%H:%M:%S')}] {target_name} 观测计划已启动")
-                self.log_manager.info(f"{target_name} 观测计划已启动")
+                self.log_manager.event("%s 观测计划已启动", target_name)
                 
                 # 监控观测过程
                 monitor_result = self._monitor_observation(target)
@@ -199,21 +296,20 @@ class TargetObservationExecutor:
                 return monitor_result.get('success', True) if monitor_result else True
             else:
                 error_msg = f"{target_name} 观测计划启动失败: {error_msg}"
-                # print(f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
-                self.log_manager.error(error_msg)
+                self.log_manager.event(error_msg, level='error')
                 self._last_error = error_msg
                 return False
                 
         except Exception as e:
             error_msg = f"{target_name} 观测执行出错: {str(e)}"
-            # print(f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
-            self.log_manager.error(error_msg)
+            self.log_manager.event(error_msg, level='error')
             self._last_error = str(e)
             return False
         
         finally:
             self.current_target = None
             self.observation_start_time = None
+            self._observation_start_mono = None
     
     def _get_error_type(self, error: str) -> str:
         """获取错误类型
@@ -224,34 +320,10 @@ class TargetObservationExecutor:
         Returns:
             错误类型
         """
-        error_lower = str(error).lower()
-        
-        # 401认证错误
-        if '401' in error_lower or 'access denied' in error_lower or 'invalid login' in error_lower:
-            return 'authentication_failed'
-        elif 'connection' in error_lower and 'timeout' in error_lower:
-            return 'connection_timeout'
-        elif 'acp' in error_lower and 'server' in error_lower:
-            return 'acp_server_error'
-        elif 'observatory' in error_lower and 'offline' in error_lower:
-            return 'observatory_offline'
-        elif 'meridian' in error_lower and 'flip' in error_lower:
-            return 'meridian_flip_failed'
-        elif 'observation' in error_lower and 'timeout' in error_lower:
-            return 'observation_timeout'
-        elif 'imaging' in error_lower and 'plan' in error_lower:
-            return 'imaging_plan_failed'
-        elif 'status' in error_lower and 'check' in error_lower:
-            return 'status_check_failed'
-        elif 'telescope' in error_lower and ('not responding' in error_lower or 'error' in error_lower):
-            return 'telescope_error'
-        elif 'camera' in error_lower and ('error' in error_lower or 'not found' in error_lower):
-            return 'camera_error'
-        else:
-            return 'unknown_error'
+        return _classify_error(str(error))
     
     def _monitor_observation(self, target: Any):
-        """监控观测过程
+        """监控观测过程（以计划预计时长乘以安全系数作为超时）
         
         Args:
             target: 目标配置 (TargetConfig对象)
@@ -259,85 +331,164 @@ class TargetObservationExecutor:
         Returns:
             dict: 监控结果，包含 success 和 error 信息
         """
+        return self._run_monitor(target)
+    
+    def _run_monitor(self, target: Any, *, timeout_minutes: Optional[float] = None) -> Dict[str, Any]:
+        """监控循环（_monitor_observation 和 monitor_target_observation 共用）
+        
+        Args:
+            target: 目标配置 (TargetConfig对象)
+            timeout_minutes: 超时时间（分钟），为 None 时使用计划预计时长乘以安全系数
+            
+        Returns:
+            dict: 监控结果，包含 success、target、start_time、end_time 和 error 信息
+        """
         target_name = target.name
-        # print(f"[{datetime.now().strftime('%H:%M:%S')}] 开始监控 {target_name} 观测状态（每30秒刷新）")
-        # print("按 Ctrl+C 可跳过当前目标监控，继续下一个目标")
-        # print("="*60)
+        result = {
+            'success': False,
+            'target': target_name,
+            'start_time': datetime.now(),
+            'end_time': None,
+            'error': None
+        }
+        
+        if timeout_minutes is None:
+            # 以计划预计时长乘以安全系数作为监控上限，避免ACP卡住时无限等待
+            plan_status = self.imaging_manager.get_current_plan_status()
+            estimated_s = plan_status.get('plan', {}).get('estimated_duration_seconds', 3600.0)
+            timeout_s = estimated_s * self.monitor_safety_factor
+            timeout_desc = f"超过预计时长的 {self.monitor_safety_factor} 倍"
+            timeout_error = 'observation timeout'  # 可被重试策略识别为 observation_timeout
+        else:
+            timeout_s = timeout_minutes * 60
+            timeout_desc = f"{timeout_minutes}分钟"
+            timeout_error = '观测超时'
+        deadline_s = time.monotonic() + timeout_s
         
-        self.log_manager.info(f"开始监控 {target_name} 观测状态（每30秒刷新）")
-        self.log_manager.info("按 Ctrl+C 可跳过当前目标监控，继续下一个目标")
-        self.log_manager.info("="*60)
+        self.log_manager.event("开始监控 %s 观测状态（每%s-%s秒自适应刷新）", target_name, self._poll_min, self._poll_max)
+        self.log_manager.event("按 Ctrl+C 可跳过当前目标监控，继续下一个目标")
+        self.log_manager.event(_SEP60)
         
-        result = {'success': True, 'error': None}
-        last_status = None
+        last_sig = None
+        last_state = None
+        self._poll_interval = self._poll_min
+        self._err_interval = self._err_min
         
         try:
             while True:
+                # 检查是否被取消
+                if self._cancel_event.is_set():
+                    self.log_manager.event("%s 观测监控被取消", target_name, level='warning')
+                    result['error'] = 'cancelled'
+                    return result
+                
+                # 检查超时
+                if time.monotonic() > deadline_s:
+                    self.log_manager.event("%s 观测超时（%s）", target_name, timeout_desc, level='error')
+                    result['error'] = timeout_error
+                    return result
+                
                 current_time = datetime.now()
+                ts = TimeUtils.now_hms()
                 
                 # 获取状态
                 status = self._get_observation_status(target, current_time)
                 
                 if status is None:
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] ⚠️ 无法获取 {target_name} 的观测状态")
-                    self.log_manager.warning(f"无法获取 {target_name} 的观测状态")
-                    time.sleep(5)
+                    self.log_manager.event("无法获取 %s 的观测状态", target_name, level='warning')
+                    # 出错退避期间也响应取消请求（循环开头会检查并返回）
+                    self._cancel_event.wait(timeout=self._err_interval)
+                    self._err_interval = min(self._err_interval * 2, self._err_max)
                     continue
+                self._err_interval = self._err_min
                 
-                # 检查是否有状态更新
-                if status != last_status:
-                    last_status = status
+                # 检查是否有状态更新（只比较关键字段，忽略时间戳等每次都变化的字段）
+                sig = (
+                    status['acp_status'].get('is_running'),
+                    status['acp_status'].get('filter'),
+                    round(status['progress'], 2),
+                    status['meridian_info'].get('status')
+                )
+                if sig != last_sig:
+                    last_sig = sig
                     
-                    # 执行状态回调
-                    for callback in self.status_callbacks:
+                    # 执行状态回调（遍历快照，回调中注册新回调不影响本次分发）
+                    for callback in tuple(self.status_callbacks):
                         try:
-                            callback(target, status)
+                            callback(status)
                         except Exception as e:
-                            self.log_manager.warning(f"状态回调出错: {str(e)}")
+                            self.log_manager.event("状态回调出错: %s", e, level='warning')
                     
                     # 显示状态信息
-                    self._display_status(target_name, status)
+                    self._print_status(status, ts)
                 
                 # 检查是否完成
-                if self._is_observation_complete(status):
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] ✅ {target_name} 观测完成")
-                    self.log_manager.info(f"{target_name} 观测完成")
-                    return {'success': True}
+                if status['is_completed']:
+                    self.log_manager.event("%s 观测完成", target_name)
+                    result['success'] = True
+                    result['end_time'] = current_time
+                    return result
+                
+                # 检查是否有错误状态
+                if status['has_error']:
+                    error = status['acp_status'].get('error', '未知错误')
+                    self.log_manager.event("%s 观测出现错误: %s", target_name, error, level='error')
+                    result['error'] = error
+                    return result
                 
                 # 检查是否需要等待中天反转
-                if status.get('meridian_info', {}).get('wait_needed', False):
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] ⏳ {target_name} 等待中天反转...")
-                    self.log_manager.info(f"{target_name} 等待中天反转")
-                    
-                    # 等待中天反转
-                    wait_success = self.meridian_manager.wait_for_meridian_flip(target)
-                    
-                    if wait_success:
-                        # print(f"[{current_time.strftime('%H:%M:%S')}] ✅ {target_name} 中天反转等待完成")
-                        self.log_manager.info(f"{target_name} 中天反转等待完成")
-                    else:
-                        # print(f"[{current_time.strftime('%H:%M:%S')}] ⚠️ {target_name} 中天反转等待失败，继续监控...")
-                        self.log_manager.warning(f"{target_name} 中天反转等待失败，继续监控")
+                if status['meridian_info'].get('wait_needed') and self.meridian_manager:
+                    if not self._handle_meridian_wait(target, current_time):
+                        result['error'] = '中天反转等待被中断'
+                        return result
                 
-                # 检查是否有错误状态
-                if status.get('error'):
-                    error_msg = f"{target_name} 观测出现错误: {status['error']}"
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] ❌ {error_msg}")
-                    self.log_manager.error(error_msg)
-                    return {'success': False, 'error': status['error']}
+                # 计算下次轮询间隔：状态变化或接近完成时恢复最小间隔，否则逐步退避
+                state = (
+                    status['acp_status'].get('is_running'),
+                    status['acp_status'].get('filter'),
+                    status['meridian_info'].get('status')
+                )
+                if state != last_state or status['progress'] > 0.9:
+                    self._poll_interval = self._poll_min
+                else:
+                    self._poll_interval = min(self._poll_interval * 1.3, self._poll_max)
+                last_state = state
                 
-                # 短暂休眠
-                time.sleep(self.status_check_interval)
+                # 等待到下次轮询（不超过监控截止时间），收到取消请求时立即返回
+                wait_s = min(self._poll_interval, max(deadline_s - time.monotonic(), 0))
+                self._cancel_event.wait(timeout=wait_s)
                 
         except KeyboardInterrupt:
-            # print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ⏹️ 用户中断观测")
-            self.log_manager.info(f"用户中断 {target_name} 观测")
-            return {'success': False, 'error': 'user_interrupted'}
+            self.log_manager.event("用户中断 %s 观测", target_name)
+            result['error'] = 'user_interrupted'
+            return result
         except Exception as e:
-            error_msg = f"监控 {target_name} 时出错: {str(e)}"
-            # print(f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
-            self.log_manager.error(error_msg)
-            return {'success': False, 'error': str(e)}
+            self.log_manager.event("监控 %s 时出错: %s", target_name, e, level='error')
+            result['error'] = str(e)
+            return result
+    
+    def _handle_meridian_wait(self, target: Any, current_time: datetime) -> bool:
+        """等待中天反转完成
+        
+        Args:
+            target: 目标配置 (TargetConfig对象)
+            current_time: 本轮询的当前时间
+            
+        Returns:
+            bool: 等待是否成功完成
+        """
+        self.log_manager.event("%s 等待中天反转", target.name)
+        
+        wait_success = self.meridian_manager.wait_for_meridian_flip(
+            target.ra, target.dec, current_time, stop_event=self._cancel_event
+        )
+        
+        if not wait_success:
+            self.log_manager.event("%s 中天反转等待被中断", target.name)
+            return False
+        
+        self.log_manager.event("%s 中天反转等待完成", target.name)
+        return True
     
     def _get_observation_status(self, target: Any, current_time: datetime) -> Dict[str, Any]:
         """获取观测状态
@@ -349,16 +500,19 @@ class TargetObservationExecutor:
         Returns:
             状态字典
         """
-        # 获取ACP状态
+        # 获取ACP状态（每次轮询只请求一次）
         acp_status = self.connection_manager.get_status()
         
-        # 获取当前计划状态
-        plan_status = self.imaging_manager.get_current_plan_status()
+        # 获取当前计划状态，复用上面的ACP状态
+        plan_status = self.imaging_manager.get_current_plan_status(acp_status)
         
-        # 计算观测进度
-        elapsed_time = current_time - self.observation_start_time if self.observation_start_time else timedelta(0)
-        estimated_duration = plan_status.get('plan', {}).get('estimated_duration', timedelta(hours=1))
-        progress = min(elapsed_time.total_seconds() / estimated_duration.total_seconds(), 1.0)
+        # 计算观测进度（使用单调时钟秒数，避免每次轮询做datetime运算）
+        if self._observation_start_mono is not None:
+            elapsed_s = time.monotonic() - self._observation_start_mono
+        else:
+            elapsed_s = 0.0
+        estimated_s = plan_status.get('plan', {}).get('estimated_duration_seconds', 3600.0)
+        progress = min(elapsed_s / estimated_s, 1.0) if estimated_s > 0 else 1.0
         
         # 检查是否完成
         is_completed = not acp_status.get('is_running', False)
@@ -366,18 +520,21 @@ class TargetObservationExecutor:
         # 检查中天反转需求
         meridian_info = self._check_meridian_flip(target, current_time)
         
-        return {
-            'target_name': target.name,
-            'current_time': current_time,
-            'elapsed_time': elapsed_time,
-            'estimated_duration': estimated_duration,
-            'progress': progress,
-            'is_completed': is_completed,
-            'has_error': acp_status.get('error') is not None,
-            'acp_status': acp_status,
-            'plan_status': plan_status,
-            'meridian_info': meridian_info
-        }
+        # 原地更新状态缓冲区
+        status = self._status_buf
+        status['target_name'] = target.name
+        status['current_time'] = current_time
+        status['elapsed_seconds'] = elapsed_s
+        status['estimated_seconds'] = estimated_s
+        status['elapsed_time'] = timedelta(seconds=elapsed_s)  # 仅供显示
+        status['estimated_duration'] = timedelta(seconds=estimated_s)  # 仅供显示
+        status['progress'] = progress
+        status['is_completed'] = is_completed
+        status['has_error'] = acp_status.get('error') is not None
+        status['acp_status'] = acp_status
+        status['plan_status'] = plan_status
+        status['meridian_info'] = meridian_info
+        return status
     
     def _check_meridian_flip(self, target: Any, current_time: datetime) -> Dict[str, Any]:
         """检查中天反转
@@ -400,8 +557,15 @@ class TargetObservationExecutor:
         
         # 如果中天管理器可用，使用实际的中天反转检查
         if self.meridian_manager:
+            # 同一分钟内的检查结果在TTL内直接复用
+            cache_key = (id(target), current_time.replace(second=0, microsecond=0))
+            now_mono = time.monotonic()
+            cached = self._meridian_cache.get(cache_key)
+            if cached and now_mono - cached[0] < self._meridian_cache_ttl:
+                return cached[1]
+            
             try:
-                return self.meridian_manager.check_meridian_flip_needed(
+                meridian_info = self.meridian_manager.check_meridian_flip_needed(
                     target.ra, target.dec, current_time
                 )
             except Exception as e:
@@ -410,6 +574,11 @@ class TargetObservationExecutor:
                     'message': f'中天反转检查出错: {str(e)}',
                     'wait_needed': False
                 }
+            
+            # 只保留最新一分钟的结果
+            self._meridian_cache.clear()
+            self._meridian_cache[cache_key] = (now_mono, meridian_info)
+            return meridian_info
         
         # 如果中天管理器不可用，返回默认信息
         return {
@@ -418,43 +587,47 @@ class TargetObservationExecutor:
             'message': '中天反转检查未启用'
         }
     
-    def _print_status(self, status: Dict[str, Any]):
+    def _print_status(self, status: Dict[str, Any], ts: Optional[str] = None):
         """打印状态信息
         
         Args:
             status: 状态字典
+            ts: 本轮询已格式化的时间戳（HH:MM:SS），为空时根据状态时间生成
         """
-        current_time = status['current_time'].strftime('%H:%M:%S')
-        target_name = status['target_name']
-        
-        # 基础状态
-        if status['acp_status'].get('is_running'):
-            status_msg = f"[{current_time}] {target_name} 状态: 运行中 [OK]"
-        else:
-            status_msg = f"[{current_time}] {target_name} 状态: 已停止 [STOP]"
-        
-        # 进度信息
-        progress = status['progress'] * 100
-        elapsed_min = status['elapsed_time'].total_seconds() / 60
-        total_min = status['estimated_duration'].total_seconds() / 60
-        
-        status_msg += f" | 进度: {progress:.1f}% ({elapsed_min:.0f}/{total_min:.0f}分钟)"
+        # 日志不会输出且不回显到控制台时，跳过整条状态信息的构造
+        if self.log_manager.enable_console and not self.log_manager.isEnabledFor(logging.INFO):
+            return
+        
+        if ts is None:
+            ts = status['current_time'].strftime('%H:%M:%S')
+        acp_status = status['acp_status']
+        
+        # 基础状态和进度信息（% 风格参数交给日志器延迟格式化）
+        fmt = _LOG_PREFIX.format(ts=ts) + "%s 状态: %s | 进度: %.1f%% (%.0f/%.0f分钟)"
+        args = [
+            status['target_name'],
+            "运行中 [OK]" if acp_status.get('is_running') else "已停止 [STOP]",
+            status['progress'] * 100,
+            status['elapsed_seconds'] / 60,
+            status['estimated_seconds'] / 60
+        ]
         
         # 滤镜信息（如果有）
-        if status['acp_status'].get('filter'):
-            status_msg += f" | 滤镜: {status['acp_status']['filter']}"
+        if acp_status.get('filter'):
+            fmt += " | 滤镜: %s"
+            args.append(acp_status['filter'])
         
         # 中天反转信息
         meridian_info = status['meridian_info']
         if meridian_info.get('wait_needed'):
-            status_msg += f" | 中天反转: {meridian_info['message']}"
+            fmt += " | 中天反转: %s"
+            args.append(meridian_info['message'])
         elif meridian_info.get('status') == 'disabled':
-            status_msg += f" | 中天反转: 已禁用"
+            fmt += " | 中天反转: 已禁用"
         elif meridian_info.get('status') == 'error':
-            status_msg += f" | 中天反转: 错误"
+            fmt += " | 中天反转: 错误"
         
-        # print(status_msg)
-        self.log_manager.info(status_msg)
+        self.log_manager.event(fmt, *args)
     
     def monitor_target_observation(self, target: Any, timeout_minutes: int = 60) -> Dict[str, Any]:
         """监控目标观测
@@ -466,83 +639,4 @@ class TargetObservationExecutor:
         Returns:
             观测结果字典
         """
-        target_name = target.name
-        # print(f"[{datetime.now().strftime('%H:%M:%S')}] 开始监控 {target_name} 观测状态（每30秒刷新）")
-        # print("按 Ctrl+C 可跳过当前目标监控，继续下一个目标")
-        # print("="*60)
-        
-        self.log_manager.info(f"开始监控 {target_name} 观测状态（每30秒刷新）")
-        self.log_manager.info("按 Ctrl+C 可跳过当前目标监控，继续下一个目标")
-        self.log_manager.info("="*60)
-        
-        result = {
-            'success': True,
-            'target': target_name,
-            'start_time': datetime.now(),
-            'end_time': None,
-            'error': None
-        }
-        
-        try:
-            while True:
-                current_time = datetime.now()
-                
-                # 获取状态
-                status = self._get_observation_status(target, current_time)
-                
-                # 执行状态回调
-                for callback in self.status_callbacks:
-                    callback(status)
-                
-                # 打印状态
-                self._print_status(status)
-                
-                # 检查是否完成
-                if status['is_completed']:
-                    result['end_time'] = current_time
-                    break
-                
-                # 检查是否出错
-                if status['has_error']:
-                    result['success'] = False
-                    result['error'] = status['acp_status'].get('error', '未知错误')
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] 观测出现错误，停止监控")
-                    self.log_manager.info("观测出现错误，停止监控")
-                    break
-                
-                # 检查超时
-                elapsed_minutes = (current_time - result['start_time']).total_seconds() / 60
-                if elapsed_minutes >= timeout_minutes:
-                    result['success'] = False
-                    result['error'] = '观测超时'
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] 观测超时（{timeout_minutes}分钟）")
-                    self.log_manager.info(f"观测超时（{timeout_minutes}分钟）")
-                    break
-                
-                # 检查中天反转等待
-                if status['meridian_info'].get('wait_needed'):
-                    # print(f"[{current_time.strftime('%H:%M:%S')}] 检测到中天反转等待需求")
-                    self.log_manager.info("检测到中天反转等待需求")
-                    wait_success = self.meridian_manager.wait_for_meridian_flip(
-                        target.ra, target.dec, current_time
-                    )
-                    if not wait_success:
-                        result['success'] = False
-                        result['error'] = '中天反转等待被中断'
-                        # print(f"[{current_time.strftime('%H:%M:%S')}] 中天反转等待被中断")
-                        self.log_manager.info("中天反转等待被中断")
-                        break
-                
-                time.sleep(30)  # 30秒检查一次
-                
-        except KeyboardInterrupt:
-            # print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 用户中断监控，继续执行")
-            self.log_manager.info("用户中断监控，继续执行")
-            result['error'] = '用户中断'
-        except Exception as e:
-            # print(f"[{datetime.now().strftime('%H:%M:%S')}] 监控过程出错: {e}")
-            self.log_manager.error(f"监控过程出错: {e}")
-            result['success'] = False
-            result['error'] = str(e)
-        
-        return result
\ No newline at end of file
+        return self._run_monitor(target, timeout_minutes=timeout_minutes)
@@ -3,15 +3,15 @@
 负责计算中天时间并在中天前后自动停止/恢复观测
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
 import math
+import threading
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from .utils.log_manager import LogManager
+from .utils.time_utils import TimeUtils
 
 
 class MeridianFlipManager:
@@ -35,6 +35,26 @@ class MeridianFlipManager:
         self.observatory_latitude = 39.9  # 北京纬度（度）
         self.observatory_longitude = 116.4  # 北京经度（度）
         
+        # 取消事件：cancel() 置位后立即结束中天反转等待；_wait_event 为当前等待实际使用的事件
+        self._cancel_event = threading.Event()
+        self._wait_event = self._cancel_event
+        self.progress_interval = 60  # 等待期间刷新剩余时间的间隔（秒）
+        
+        # 本地恒星时缓存：键为 (观测时间取整到分钟, 经度)，轮询期间同一分钟内直接复用
+        self._lst_cache: dict = {}
+        
+    def cancel(self):
+        """取消正在进行的中天反转等待（可从信号处理器或其他线程调用）
+        
+        取消状态会一直保持，之后的等待也会立即返回，直到调用 reset()。
+        """
+        self._cancel_event.set()
+        self._wait_event.set()
+    
+    def reset(self):
+        """清除取消状态（在新一轮观测开始时调用，不在每次等待时清除以免丢失取消请求）"""
+        self._cancel_event.clear()
+    
     def set_observatory_location(self, latitude: float, longitude: float):
         """设置观测站位置
         
@@ -60,39 +80,91 @@ class MeridianFlipManager:
             # 解析赤经赤纬
             ra_hours = self._parse_ra(ra)
             dec_degrees = self._parse_dec(dec)
+        except Exception as e:
+            self.log_manager.error("计算中天时间失败: %s", e)
+            return None
+        
+        return self.calculate_meridian_time_numeric(ra_hours, dec_degrees, observation_date)
+    
+    def calculate_meridian_time_numeric(self, ra_hours: float, dec_degrees: float,
+                                        observation_date: datetime) -> Optional[datetime]:
+        """根据已解析的坐标计算目标的中天时间（目标坐标在加载配置时已解析时使用）
+        
+        Args:
+            ra_hours: 赤经（小时）
+            dec_degrees: 赤纬（度）
+            observation_date: 观测日期
             
-            # 计算本地恒星时（LST）
-            lst = self._calculate_lst(observation_date)
-            
-            # 计算中天时间
-            # 中天时，LST = RA
-            meridian_lst = ra_hours
-            
-            # 计算当前LST与中天LST的时间差
-            current_lst_hours = lst
-            delta_lst = meridian_lst - current_lst_hours
-            
-            # 调整到-12到+12小时范围内
-            if delta_lst > 12:
-                delta_lst -= 24
-            elif delta_lst < -12:
-                delta_lst += 24
-            
-            # 计算中天时间
-            meridian_time = observation_date + timedelta(hours=delta_lst)
-            
-            # 确保是今天的中天时间
-            if meridian_time.date() < observation_date.date():
-                meridian_time += timedelta(days=1)
-            elif meridian_time.date() > observation_date.date():
-                meridian_time -= timedelta(days=1)
+        Returns:
+            中天时间（本地时间）
+        """
+        try:
+            # 计算本地恒星时（LST）及其对应的取整时刻
+            lst, lst_time = self._calculate_lst(observation_date)
             
-            return meridian_time
+            return self._meridian_time_from_lst(ra_hours, lst, lst_time)
             
         except Exception as e:
-            self.log_manager.error(f"计算中天时间失败: {str(e)}")
+            self.log_manager.error("计算中天时间失败: %s", e)
             return None
     
+    def calculate_meridian_times(self, ras: List[str], decs: List[str],
+                                 observation_date: datetime) -> List[Optional[datetime]]:
+        """批量计算多个目标的中天时间（本地恒星时只计算一次）
+        
+        Args:
+            ras: 赤经列表（字符串格式）
+            decs: 赤纬列表（字符串格式），与 ras 一一对应
+            observation_date: 观测日期
+            
+        Returns:
+            中天时间列表，计算失败的目标对应 None
+        """
+        lst, lst_time = self._calculate_lst(observation_date)
+        
+        results = []
+        for ra, dec in zip(ras, decs):
+            try:
+                ra_hours = self._parse_ra(ra)
+                self._parse_dec(dec)
+                results.append(self._meridian_time_from_lst(ra_hours, lst, lst_time))
+            except Exception as e:
+                self.log_manager.error("计算中天时间失败: %s", e)
+                results.append(None)
+        
+        return results
+    
+    def _meridian_time_from_lst(self, ra_hours: float, lst: float, observation_date: datetime) -> datetime:
+        """根据赤经和观测时刻的本地恒星时计算中天时间
+        
+        Args:
+            ra_hours: 赤经（小时）
+            lst: 观测时刻的本地恒星时（小时）
+            observation_date: 计算 lst 所用的时刻（须与 lst 对应，即 _calculate_lst 返回的取整时刻）
+            
+        Returns:
+            中天时间（本地时间）
+        """
+        # 中天时，LST = RA，计算当前LST与中天LST的时间差
+        delta_lst = ra_hours - lst
+        
+        # 调整到-12到+12小时范围内
+        if delta_lst > 12:
+            delta_lst -= 24
+        elif delta_lst < -12:
+            delta_lst += 24
+        
+        # 计算中天时间
+        meridian_time = observation_date + timedelta(hours=delta_lst)
+        
+        # 确保是今天的中天时间
+        if meridian_time.date() < observation_date.date():
+            meridian_time += timedelta(days=1)
+        elif meridian_time.date() > observation_date.date():
+            meridian_time -= timedelta(days=1)
+        
+        return meridian_time
+    
     def calculate_meridian_flip_window(self, ra: str, dec: str, observation_date: datetime) -> dict:
         """计算中天反转时间窗口
         
@@ -117,6 +189,10 @@ class MeridianFlipManager:
             'stop_time': stop_time,
             'meridian_time': meridian_time,
             'resume_time': resume_time,
+            # 时间戳形式（秒），供窗口判断直接做浮点比较
+            'stop_ts': stop_time.timestamp(),
+            'meridian_ts': meridian_time.timestamp(),
+            'resume_ts': resume_time.timestamp(),
             'stop_minutes_before': self.stop_minutes_before,
             'resume_minutes_after': self.resume_minutes_after
         }
@@ -145,10 +221,15 @@ class MeridianFlipManager:
         resume_time = flip_window['resume_time']
         meridian_time = flip_window['meridian_time']
         
-        # 检查当前时间状态
-        if current_time < stop_time:
+        # 检查当前时间状态（统一换算为时间戳后做浮点比较，不产生 timedelta 对象）
+        now_ts = current_time.timestamp()
+        stop_ts = flip_window['stop_ts']
+        meridian_ts = flip_window['meridian_ts']
+        resume_ts = flip_window['resume_ts']
+        
+        if now_ts < stop_ts:
             # 在中天窗口之前，可以正常观测
-            time_until_stop = (stop_time - current_time).total_seconds() / 60
+            time_until_stop = (stop_ts - now_ts) / 60
             return {
                 'status': 'before_window',
                 'message': f'距离中天停止还有 {time_until_stop:.1f} 分钟',
@@ -159,9 +240,9 @@ class MeridianFlipManager:
                 'time_until_stop': time_until_stop
             }
         
-        elif stop_time <= current_time < meridian_time:
+        elif now_ts < meridian_ts:
             # 在中天停止期间
-            time_until_meridian = (meridian_time - current_time).total_seconds() / 60
+            time_until_meridian = (meridian_ts - now_ts) / 60
             return {
                 'status': 'stop_before_meridian',
                 'message': f'中天前停止期，中天还有 {time_until_meridian:.1f} 分钟',
@@ -173,10 +254,10 @@ class MeridianFlipManager:
                 'time_until_meridian': time_until_meridian
             }
         
-        elif meridian_time <= current_time < resume_time:
+        elif now_ts < resume_ts:
             # 在中天恢复期间
-            time_after_meridian = (current_time - meridian_time).total_seconds() / 60
-            time_until_resume = (resume_time - current_time).total_seconds() / 60
+            time_after_meridian = (now_ts - meridian_ts) / 60
+            time_until_resume = (resume_ts - now_ts) / 60
             return {
                 'status': 'wait_after_meridian',
                 'message': f'中天后等待期，已中天 {time_after_meridian:.1f} 分钟，还需等待 {time_until_resume:.1f} 分钟',
@@ -190,7 +271,7 @@ class MeridianFlipManager:
         
         else:
             # 中天窗口已过，可以恢复观测
-            time_after_resume = (current_time - resume_time).total_seconds() / 60
+            time_after_resume = (now_ts - resume_ts) / 60
             return {
                 'status': 'after_window',
                 'message': f'中天窗口已过 {time_after_resume:.1f} 分钟，可以恢复观测',
@@ -201,13 +282,15 @@ class MeridianFlipManager:
                 'time_after_resume': time_after_resume
             }
     
-    def wait_for_meridian_flip(self, ra: str, dec: str, current_time: datetime) -> bool:
+    def wait_for_meridian_flip(self, ra: str, dec: str, current_time: datetime,
+                               stop_event: Optional[threading.Event] = None) -> bool:
         """等待中天反转完成
         
         Args:
             ra: 赤经（字符串格式）
             dec: 赤纬（字符串格式）
             current_time: 当前时间
+            stop_event: 停止事件，置位后立即结束等待（如 SIGTERM 触发的取消）
             
         Returns:
             True: 等待完成，可以继续观测
@@ -218,47 +301,83 @@ class MeridianFlipManager:
         if not flip_info['wait_needed']:
             return True
         
+        # DRYRUN 模式只记录需要等待的情况，不输出等待详情也不做任何等待
+        if self.dryrun:
+            self.log_manager.info("[DRYRUN] 跳过中天反转等待: %s", flip_info['message'])
+            return True
+        
         wait_until = flip_info['wait_until']
         status = flip_info['status']
         
         if status == 'stop_before_meridian':
-            print(f"\n[{current_time.strftime('%H:%M:%S')}] 🌟 中天反转等待")
-            print(f"  目标将在 {flip_info['meridian_time'].strftime('%H:%M:%S')} 中天")
-            print(f"  将在 {wait_until.strftime('%H:%M:%S')} 后继续观测")
-            print(f"  预计等待时间: {flip_info['time_until_meridian']:.1f} 分钟")
+            print(f"\n[{current_time.strftime('%H:%M:%S')}] 🌟 中天反转等待\n"
+                  f"  目标将在 {flip_info['meridian_time'].strftime('%H:%M:%S')} 中天\n"
+                  f"  将在 {wait_until.strftime('%H:%M:%S')} 后继续观测\n"
+                  f"  预计等待时间: {flip_info['time_until_meridian']:.1f} 分钟")
             
-            self.log_manager.info(f"中天前停止，等待中天反转，预计等待 {flip_info['time_until_meridian']:.1f} 分钟")
+            self.log_manager.info("中天前停止，等待中天反转，预计等待 %.1f 分钟", flip_info['time_until_meridian'])
             
         elif status == 'wait_after_meridian':
-            print(f"\n[{current_time.strftime('%H:%M:%S')}] 🌟 中天后恢复等待")
-            print(f"  中天时间: {flip_info['meridian_time'].strftime('%H:%M:%S')}")
-            print(f"  将在 {wait_until.strftime('%H:%M:%S')} 后恢复观测")
-            print(f"  还需等待: {flip_info['time_until_resume']:.1f} 分钟")
+            print(f"\n[{current_time.strftime('%H:%M:%S')}] 🌟 中天后恢复等待\n"
+                  f"  中天时间: {flip_info['meridian_time'].strftime('%H:%M:%S')}\n"
+                  f"  将在 {wait_until.strftime('%H:%M:%S')} 后恢复观测\n"
+                  f"  还需等待: {flip_info['time_until_resume']:.1f} 分钟")
             
-            self.log_manager.info(f"中天后等待，还需等待 {flip_info['time_until_resume']:.1f} 分钟")
+            self.log_manager.info("中天后等待，还需等待 %.1f 分钟", flip_info['time_until_resume'])
         
         # 执行等待
-        if self.dryrun:
-            print(f"  [DRYRUN] 模拟等待中天反转...")
-            time.sleep(2)  # 模拟等待
-            return True
+        # 外部传入停止事件时在其上等待，否则使用自身的取消事件；cancel() 对两者均有效
+        event = stop_event if stop_event is not None else self._cancel_event
+        self._wait_event = event
+        
+        # 剩余时间由独立的守护线程低频刷新，主线程只做一次截止时间等待
+        done = threading.Event()
+        # 截止时刻换算为单调时钟，等待期间不再读取墙上时钟
+        deadline = time.monotonic() + (wait_until - datetime.now()).total_seconds()
+        progress = threading.Thread(target=self._report_progress, args=(deadline, done),
+                                    name='MeridianFlipProgress', daemon=True)
+        progress.start()
         
         try:
-            while datetime.now() < wait_until:
-                remaining = (wait_until - datetime.now()).total_seconds() / 60
-                print(f"\r  剩余等待时间: {remaining:.1f} 分钟", end='', flush=True)
-                time.sleep(30)  # 每30秒更新一次
+            # 一次性等待到截止时刻（Event.wait 可能提前返回，剩余时间未到时继续等待）
+            remaining = deadline - time.monotonic()
+            while remaining > 0:
+                if event.wait(timeout=remaining):
+                    print(f"\n[{TimeUtils.now_hms()}] ❌ 中天反转等待被中断")
+                    self.log_manager.warning("中天反转等待被取消")
+                    return False
+                remaining = deadline - time.monotonic()
             
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ✅ 中天反转等待完成")
+            print(f"\n[{TimeUtils.now_hms()}] ✅ 中天反转等待完成")
             self.log_manager.info("中天反转等待完成")
             return True
             
         except KeyboardInterrupt:
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ❌ 中天反转等待被中断")
+            print(f"\n[{TimeUtils.now_hms()}] ❌ 中天反转等待被中断")
             self.log_manager.warning("中天反转等待被用户中断")
             return False
+        finally:
+            done.set()
+            self._wait_event = self._cancel_event
     
-    def _parse_ra(self, ra_str: str) -> float:
+    def _report_progress(self, deadline: float, done: threading.Event):
+        """在同一行刷新中天反转的剩余等待时间，直到 done 被置位
+        
+        Args:
+            deadline: 等待结束时刻（time.monotonic() 时间）
+            done: 等待结束事件
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            print(f"\r  剩余等待时间: {remaining / 60:.1f} 分钟", end='', flush=True)
+            if done.wait(timeout=min(self.progress_interval, remaining)):
+                return
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _parse_ra(ra_str: str) -> float:
         """解析赤经字符串为小时数
         
         Args:
@@ -274,7 +393,9 @@ class MeridianFlipManager:
         
         return hours + minutes/60 + seconds/3600
     
-    def _parse_dec(self, dec_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _parse_dec(dec_str: str) -> float:
         """解析赤纬字符串为度数
         
         Args:
@@ -291,24 +412,33 @@ class MeridianFlipManager:
         
         return sign * (degrees + minutes/60 + seconds/3600)
     
-    def _calculate_lst(self, observation_time: datetime) -> float:
+    def _calculate_lst(self, observation_time: datetime) -> Tuple[float, datetime]:
         """计算本地恒星时（LST）
         
+        恒星时按分钟取整后的时刻计算并缓存。恒星时每分钟前进约一分钟，
+        调用方必须以返回的取整时刻（而非原始观测时间）作为推算基准。
+        
         Args:
             observation_time: 观测时间
             
         Returns:
-            本地恒星时（小时）
+            (本地恒星时（小时）, 计算所用的取整时刻) 元组
         """
+        minute = observation_time.replace(second=0, microsecond=0)
+        key = (minute, round(self.observatory_longitude, 4))
+        lst = self._lst_cache.get(key)
+        if lst is not None:
+            return lst, minute
+        
         # 简化的LST计算（实际应用中可能需要更精确的算法）
         # 这里使用近似公式
         
-        # 计算儒略日
-        jd = self._calculate_julian_day(observation_time)
+        # 计算儒略日（使用取整后的分钟时刻，保证缓存值与键一致）
+        jd = self._calculate_julian_day(minute)
         
         # 计算格林尼治恒星时（GST）
         t = (jd - 2451545.0) / 36525.0
-        gst = 6.697374558 + 2400.051336 * t + 0.000025862 * t * t
+        gst = 6.697374558 + t * (2400.051336 + 0.000025862 * t)  # 秦九韶（Horner）形式求值
         gst = gst % 24
         
         # 转换为本地恒星时
@@ -316,7 +446,10 @@ class MeridianFlipManager:
         lst = gst + longitude_hours
         lst = lst % 24
         
-        return lst
+        if len(self._lst_cache) >= 1440:
+            self._lst_cache.clear()
+        self._lst_cache[key] = lst
+        return lst, minute
     
     def _calculate_julian_day(self, date: datetime) -> float:
         """计算儒略日
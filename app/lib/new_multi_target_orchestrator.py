@@ -7,9 +7,13 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+import json
+import logging
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Callable
+from operator import attrgetter
 from pathlib import Path
 
 # 导入新的核心模块
@@ -23,6 +27,15 @@ from lib.utils.time_utils import TimeUtils
 from lib.utils.observation_utils import ObservationUtils
 
 
+# 程序横幅
+_BANNER = """
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                        多目标自动观测系统 v2.0                                 ║
+║                        基于重构架构的观测协调器                                 ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+        """
+
+
 class NewMultiTargetOrchestrator:
     """新的多目标观测协调器"""
     
@@ -42,8 +55,22 @@ class NewMultiTargetOrchestrator:
         self.executor = None
         self.logger = None
         
-        # 状态回调函数
+        # 配置缓存（按配置文件修改时间失效）
+        self._config_cache = None
+        self._config_mtime: Optional[float] = None
+        
+        # 目标验证结果缓存：(配置修改时间, 目标签名) -> 结果；可观测性随时间变化，因此同时设置TTL
+        self._validation_cache: Optional[List[Dict[str, Any]]] = None
+        self._validation_cache_key: Optional[tuple] = None
+        self._validation_cache_time = 0.0
+        self._validation_cache_ttl = 60  # 秒
+        
+        # 状态回调函数（分发时使用元组快照，注册时重建）
         self.status_callbacks = []
+        self._status_callbacks_tuple: tuple = ()
+        
+        # 关闭事件：shutdown() 置位后中断等待并停止后续目标
+        self._shutdown = threading.Event()
         
         # 初始化组件
         self._initialize_components()
@@ -53,7 +80,7 @@ class NewMultiTargetOrchestrator:
         try:
             # 1. 配置管理器
             self.config_manager = MultiTargetConfigManager(self.config_file, self.dry_run)
-            config = self.config_manager.get_config()
+            config = self._get_config()
             
             # 2. 日志管理器
             self.logger = LogManager(
@@ -133,9 +160,42 @@ class NewMultiTargetOrchestrator:
             
         except Exception as e:
             if self.logger:
-                self.logger.error(f"初始化失败: {e}")
+                self.logger.error("初始化失败: %s", e)
             raise
     
+    def shutdown(self):
+        """请求停止观测序列（中断目标时间等待和当前监控，可从信号处理器或其他线程调用）"""
+        self._shutdown.set()
+        if self.scheduler:
+            self.scheduler.interrupt()
+        if self.executor:
+            self.executor.cancel()
+        if self.connection_manager:
+            self.connection_manager.interrupt_wait()
+    
+    def _get_config(self):
+        """获取配置（按配置文件修改时间缓存，文件变化时重新加载）
+        
+        Returns:
+            配置对象
+        """
+        try:
+            mtime = os.stat(self.config_file).st_mtime
+        except OSError:
+            mtime = self._config_mtime
+        
+        if self._config_cache is None or mtime != self._config_mtime:
+            if self._config_cache is not None:
+                try:
+                    self.config_manager.reload()
+                    self.logger.info("配置文件已变化，重新加载配置")
+                except Exception as e:
+                    self.logger.warning("重新加载配置失败，继续使用原配置: %s", e)
+            self._config_cache = self.config_manager.get_config()
+            self._config_mtime = mtime
+        
+        return self._config_cache
+    
     def add_status_callback(self, callback: Callable[[str, Dict[str, Any]], None]):
         """添加状态回调函数
         
@@ -143,30 +203,27 @@ class NewMultiTargetOrchestrator:
             callback: 回调函数，接收(status, data)参数
         """
         self.status_callbacks.append(callback)
+        self._status_callbacks_tuple = (*self._status_callbacks_tuple, callback)
     
     def _on_observation_status(self, data: Dict[str, Any]):
         """观测状态回调"""
-        # 记录日志
-        if self.logger:
-            self.logger.debug(f"观测状态更新: {data}")
+        logger = self.logger
+        
+        # 记录日志（DEBUG未启用时跳过状态字典的格式化）
+        if logger and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("观测状态更新: %s", data)
         
-        # 调用外部回调
-        for callback in self.status_callbacks:
+        # 调用外部回调（遍历注册时生成的元组快照，回调中注册新回调不影响本次分发）
+        for callback in self._status_callbacks_tuple:
             try:
                 callback(data)
             except Exception as e:
-                if self.logger:
-                    self.logger.error(f"状态回调执行失败: {e}")
+                if logger:
+                    logger.error("状态回调执行失败: %s", e)
     
     def print_banner(self):
         """打印程序横幅"""
-        banner = """
-╔══════════════════════════════════════════════════════════════════════════════╗
-║                        多目标自动观测系统 v2.0                                 ║
-║                        基于重构架构的观测协调器                                 ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-        """
-        print(banner)
+        print(_BANNER)
         
         if self.logger:
             self.logger.info("多目标自动观测系统启动")
@@ -177,63 +234,81 @@ class NewMultiTargetOrchestrator:
         Returns:
             验证结果列表
         """
-        self.logger.info("正在验证目标列表...")
-        
-        config = self.config_manager.get_config()
+        config = self._get_config()
         targets = config.targets
         
-        results = []
+        # 配置和目标未变化且在TTL内时直接复用上次的验证结果
+        cache_key = (self._config_mtime, tuple((t.name, t.ra, t.dec, t.start_time) for t in targets))
+        if (self._validation_cache is not None and cache_key == self._validation_cache_key
+                and time.monotonic() - self._validation_cache_time < self._validation_cache_ttl):
+            return self._validation_cache
+        
+        self.logger.info("正在验证目标列表...")
         
+        # 第一遍：解析坐标，解析失败的目标记录错误
+        # （每个目标解析仅需约2微秒，进程池的启动与序列化开销远大于收益，保持串行）
+        parsed: Dict[int, tuple] = {}
+        errors: Dict[int, Exception] = {}
         for i, target in enumerate(targets):
             try:
-                # 解析坐标
-                ra_deg, dec_deg = ObservationUtils.parse_ra_dec(target.ra, target.dec)
-                
-                # 检查可观测性
-                observability = ObservationUtils.is_observable(
-                    ra_deg, dec_deg,
-                    config.observatory.latitude_deg,
-                    config.observatory.min_altitude
-                )
-                
-                # 解析时间
-                if target.start_time:
-                    start_time = TimeUtils.parse_time_string(target.start_time.strftime('%Y-%m-%d %H:%M:%S'))
-                    time_valid = start_time is not None
-                else:
-                    start_time = None
-                    time_valid = True
-                
-                result = {
-                    'index': i + 1,
-                    'name': target.name,
-                    'ra': target.ra,
-                    'dec': target.dec,
-                    'start_time': target.start_time.strftime('%Y-%m-%d %H:%M:%S') if target.start_time else None,
-                    'ra_deg': ra_deg,
-                    'dec_deg': dec_deg,
-                    'observability': observability,
-                    'time_valid': time_valid,
-                    'valid': observability['is_observable'] and time_valid
-                }
-                
-                results.append(result)
-                
-                self.logger.info(f"目标 {target.name}: "
-                               f"可观测性={observability['is_observable']}, "
-                               f"时间有效={time_valid}")
-                
+                parsed[i] = ObservationUtils.parse_ra_dec(target.ra, target.dec)
             except Exception as e:
-                self.logger.error(f"验证目标 {target.name} 失败: {e}")
-                results.append({
+                errors[i] = e
+        
+        # 批量检查可观测性（观测站参数只读取一次，本地恒星时只计算一次）
+        observatory = config.observatory
+        observabilities = dict(zip(parsed, ObservationUtils.is_observable_batch(
+            list(parsed.values()),
+            observatory.latitude_deg,
+            observatory.min_altitude
+        )))
+        
+        # 第二遍：生成验证结果（循环内使用的方法绑定为局部变量）
+        results = []
+        append_result = results.append
+        log_info = self.logger.info
+        log_error = self.logger.error
+        for i, target in enumerate(targets):
+            start_time_str = target.start_time.strftime('%Y-%m-%d %H:%M:%S') if target.start_time else None
+            
+            if i in errors:
+                log_error("验证目标 %s 失败: %s", target.name, errors[i])
+                append_result({
                     'index': i + 1,
                     'name': target.name,
                     'ra': target.ra,
                     'dec': target.dec,
-                    'start_time': target.start_time.strftime('%Y-%m-%d %H:%M:%S') if target.start_time else None,
+                    'start_time': start_time_str,
                     'valid': False,
-                    'error': str(e)
+                    'error': str(errors[i])
                 })
+                continue
+            
+            ra_deg, dec_deg = parsed[i]
+            observability = observabilities[i]
+            
+            # 开始时间在加载配置时已解析为datetime，无需再格式化后重新解析
+            time_valid = target.start_time is None or isinstance(target.start_time, datetime)
+            
+            append_result({
+                'index': i + 1,
+                'name': target.name,
+                'ra': target.ra,
+                'dec': target.dec,
+                'start_time': start_time_str,
+                'ra_deg': ra_deg,
+                'dec_deg': dec_deg,
+                'observability': observability,
+                'time_valid': time_valid,
+                'valid': observability['is_observable'] and time_valid
+            })
+            
+            log_info("目标 %s: 可观测性=%s, 时间有效=%s",
+                     target.name, observability['is_observable'], time_valid)
+        
+        self._validation_cache = results
+        self._validation_cache_key = cache_key
+        self._validation_cache_time = time.monotonic()
         
         return results
     
@@ -245,7 +320,7 @@ class NewMultiTargetOrchestrator:
         """
         self.logger.info("正在计算调度摘要...")
         
-        config = self.config_manager.get_config()
+        config = self._get_config()
         
         # 获取验证结果
         validation_results = self.validate_targets()
@@ -291,14 +366,14 @@ class NewMultiTargetOrchestrator:
         Returns:
             是否成功执行
         """
-        config = self.config_manager.get_config()
+        config = self._get_config()
         
         # 设置重试配置（如果可用）
         if hasattr(config, 'retry_settings'):
             retry_config = config.retry_settings
             if isinstance(retry_config, dict):
                 self.executor.set_retry_config(retry_config)
-                self.logger.info(f"已设置重试配置: {retry_config}")
+                self.logger.info("已设置重试配置: %s", retry_config)
         
         return self.executor.execute_target(target, config.__dict__)
     
@@ -325,14 +400,28 @@ class NewMultiTargetOrchestrator:
         
         self.logger.info("开始执行观测序列...")
         
+        # 新一轮观测序列开始：复位上一轮遗留的中断状态（已收到关闭请求时保留，不丢失该请求）
+        if not self._shutdown.is_set():
+            self.scheduler.reset()
+            if self.executor.meridian_manager:
+                self.executor.meridian_manager.reset()
+        
         # 获取配置
-        config = self.config_manager.get_config()
-        targets = config.targets
+        config = self._get_config()
+        global_stop_time = config.schedule.stop_time if config.schedule else None
         
         # 计算调度摘要
         schedule_summary = self.calculate_schedule_summary()
         
-        self.logger.info(f"计划观测 {len(targets)} 个目标")
+        # 按开始时间排序一次，并预先剔除已过期或超过全局停止时间的目标
+        now = datetime.now()
+        all_targets = sorted(config.targets, key=attrgetter('start_time'))
+        targets = [t for t in all_targets
+                   if not self.scheduler.should_skip_target(t, now, global_stop_time)]
+        skipped_count = len(all_targets) - len(targets)
+        
+        self.logger.info("计划观测 %d 个目标%s", len(targets),
+                         f"（跳过 {skipped_count} 个）" if skipped_count else "")
         
         # 连接ACP服务器
         if not self.connection_manager.connect():
@@ -349,50 +438,63 @@ class NewMultiTargetOrchestrator:
             'success': True,
             'completed_targets': 0,
             'failed_targets': 0,
+            'skipped_targets': skipped_count,
             'target_results': []
         }
         
-        for i, target in enumerate(targets):
+        policy = config.schedule.policy if config.schedule else 'fcfs'
+        if policy != 'fcfs':
+            self.logger.info("目标调度策略: %s", policy)
+        
+        for i, target in enumerate(self._iter_targets(targets, policy)):
+            if self._shutdown.is_set():
+                self.logger.warning("收到停止请求，终止观测序列")
+                break
+            
             target_name = target.name
-            self.logger.info(f"开始观测目标 {i+1}/{len(targets)}: {target_name}")
+            target_start = time.monotonic()
+            self.logger.debug("开始观测目标 %d/%d: %s", i + 1, len(targets), target_name)
             
+            status = 'failed'
+            error = None
             try:
                 # 等待目标时间
                 if not self.wait_for_target_time(target):
-                    self.logger.warning(f"跳过目标 {target_name}：时间等待失败或超时")
-                    results['failed_targets'] += 1
-                    continue
-                
+                    error = '时间等待失败或超时'
+                    status = 'skipped'
                 # 执行目标观测
-                if not self.execute_target_observation(target):
-                    self.logger.error(f"目标 {target_name} 观测执行失败")
-                    results['failed_targets'] += 1
-                    continue
-                
-                # 监控观测过程
-                observation_result = self.monitor_target_observation(target)
-                
-                if observation_result['success']:
-                    self.logger.info(f"目标 {target_name} 观测完成")
-                    results['completed_targets'] += 1
+                elif not self.execute_target_observation(target):
+                    error = '观测执行失败'
                 else:
-                    self.logger.error(f"目标 {target_name} 观测失败: {observation_result.get('error', '未知错误')}")
-                    results['failed_targets'] += 1
-                
-                results['target_results'].append({
-                    'target': target_name,
-                    'success': observation_result['success'],
-                    'result': observation_result
-                })
+                    # 监控观测过程
+                    observation_result = self.monitor_target_observation(target)
+                    
+                    if observation_result['success']:
+                        status = 'completed'
+                    else:
+                        error = observation_result.get('error', '未知错误')
+                    
+                    results['target_results'].append({
+                        'target': target_name,
+                        'success': observation_result['success'],
+                        'result': observation_result
+                    })
                 
             except Exception as e:
-                self.logger.error(f"目标 {target_name} 观测过程中出错: {e}")
-                results['failed_targets'] += 1
+                error = f"观测过程中出错: {e}"
                 results['target_results'].append({
                     'target': target_name,
                     'success': False,
                     'error': str(e)
                 })
+            
+            if status == 'completed':
+                results['completed_targets'] += 1
+            else:
+                results['failed_targets'] += 1
+            
+            self._log_target_result(i + 1, len(targets), target_name, status, error,
+                                    time.monotonic() - target_start)
         
         # 断开连接
         self.connection_manager.disconnect()
@@ -400,11 +502,59 @@ class NewMultiTargetOrchestrator:
         # 总结结果
         results['success'] = results['failed_targets'] == 0
         
-        self.logger.info(f"观测序列完成: 成功 {results['completed_targets']} 个, "
-                        f"失败 {results['failed_targets']} 个")
+        self.logger.info("观测序列完成: 成功 %d 个, 失败 %d 个",
+                         results['completed_targets'], results['failed_targets'])
+        self.logger.flush()
         
         return results
     
+    def _iter_targets(self, targets: List[Any], policy: str):
+        """按调度策略依次产出待观测目标
+        
+        Args:
+            targets: 已按开始时间排序的目标列表
+            policy: 调度策略（fcfs/greedy_slew）
+            
+        Yields:
+            下一个要观测的目标
+        """
+        if policy != 'greedy_slew':
+            yield from targets
+            return
+        
+        # 每观测完一个目标后，根据当前时间和上一个目标位置重新选择代价最小的目标
+        pending = list(targets)
+        previous = None
+        while pending:
+            previous = pending.pop(self.scheduler.select_next_target(pending, previous))
+            yield previous
+    
+    def _log_target_result(self, index: int, total: int, target_name: str,
+                           status: str, error: Optional[str], duration_s: float):
+        """以一条结构化日志记录单个目标的观测结果
+        
+        Args:
+            index: 目标序号
+            total: 目标总数
+            target_name: 目标名称
+            status: 结果状态（completed/failed/skipped）
+            error: 错误信息
+            duration_s: 耗时（秒）
+        """
+        level = logging.INFO if status == 'completed' else logging.WARNING
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        record = {
+            'index': f"{index}/{total}",
+            'target': target_name,
+            'status': status,
+            'duration_s': round(duration_s, 1)
+        }
+        if error:
+            record['error'] = error
+        self.logger.logger.log(level, "目标结果: %s", json.dumps(record, ensure_ascii=False))
+    
     def get_status(self) -> Dict[str, Any]:
         """获取当前状态
         
@@ -421,7 +571,7 @@ class NewMultiTargetOrchestrator:
                 self.logger is not None
             ]),
             'connected': self.connection_manager.get_status() if self.connection_manager else False,
-            'config_loaded': self.config_manager is not None and self.config_manager.get_config() is not None,
+            'config_loaded': self.config_manager is not None and self._get_config() is not None,
             'dry_run': self.dry_run
         }
         
@@ -438,6 +588,7 @@ class NewMultiTargetOrchestrator:
         # 关闭日志
         if self.logger:
             self.logger.info("多目标观测协调器关闭")
+            self.logger.flush()
 
 
 # 向后兼容的别名
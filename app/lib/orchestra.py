@@ -2,103 +2,153 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from ACP.gui.logger import LogManager
 from lib.plan_builder import ImagingPlanBuilder
 from lib.time_manager import TimeManager
+from lib.utils.time_utils import TimeUtils
 from lib.acp_mamager import ACPManager
 
 
+# 分隔线（模块加载时生成一次）
+_SEP70 = '=' * 70
+_SEP50 = '=' * 50
+
+# 停止时间处的停止操作确认成功后，在此时间窗口（秒）内到达启动时间则不再重复停止
+_STOP_REUSE_SECONDS = 60
+
+
 class ObservationOrchestrator:
     """观测编排类 - 协调整个观测流程"""
     def __init__(self, config):
         self.config = config
+        self._dryrun_prefix = '[DRYRUN] ' if config.dryrun else ''
         self.log_manager = LogManager('AutoObserve_NGC1499')
         self.time_manager = TimeManager(config.dryrun)
         self.acp_manager = ACPManager(config, self.log_manager)
         self.plan_builder = ImagingPlanBuilder(config)
+        self._banner_str = self._build_banner()
+        # 是否回显每次轮询的状态行；关闭时只在状态变化时回显（日志始终完整记录）
+        self.verbose = getattr(config, 'verbose', False)
+        # 关闭事件：shutdown() 置位后立即结束状态监控
+        self._shutdown = threading.Event()
     
-    def print_banner(self):
-        """打印脚本信息横幅"""
-        print("="*70)
-        print("NGC 1499 自动观测脚本")
+    def _build_banner(self) -> str:
+        """根据配置生成脚本信息横幅（配置固定，初始化时生成一次）"""
+        lines = [_SEP70, "NGC 1499 自动观测脚本"]
         if self.config.dryrun:
-            print("*** DRYRUN 模式 - 仅模拟运行，不实际执行 ***")
-        print("="*70)
-        print(f"目标名称: {self.config.target_name}")
-        print(f"坐标: RA {self.config.target_ra}, DEC {self.config.target_dec}")
-        print(f"\n滤镜配置 ({len(self.config.filters)}个滤镜):")
+            lines.append("*** DRYRUN 模式 - 仅模拟运行，不实际执行 ***")
+        lines.append(_SEP70)
+        lines.append(f"目标名称: {self.config.target_name}")
+        lines.append(f"坐标: RA {self.config.target_ra}, DEC {self.config.target_dec}")
+        lines.append(f"\n滤镜配置 ({len(self.config.filters)}个滤镜):")
         for i, filter_cfg in enumerate(self.config.filters, 1):
-            filter_name = filter_cfg.get('name', f"Filter {filter_cfg['filter_id']}")
-            print(f"  {i}. {filter_name} (ID: {filter_cfg['filter_id']})")
-            print(f"     曝光: {filter_cfg['exposure']}秒 x {filter_cfg['count']}张")
-            print(f"     Binning: {filter_cfg['binning']}x{filter_cfg['binning']}")
-        print(f"\n总图像数: {self.config.get_total_images()}张")
-        print(f"预计总时间: {self.config.get_total_hours():.1f}小时")
+            filter_name = filter_cfg.get('name') or f"Filter {filter_cfg['filter_id']}"
+            lines.append(f"  {i}. {filter_name} (ID: {filter_cfg['filter_id']})")
+            lines.append(f"     曝光: {filter_cfg['exposure']}秒 x {filter_cfg['count']}张")
+            lines.append(f"     Binning: {filter_cfg['binning']}x{filter_cfg['binning']}")
+        lines.append(f"\n总图像数: {self.config.get_total_images()}张")
+        lines.append(f"预计总时间: {self.config.get_total_hours():.1f}小时")
         if self.config.stop_time:
-            print(f"计划停止时间: {self.config.stop_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"计划启动时间: {self.config.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*70)
+            lines.append(f"计划停止时间: {self.config.stop_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append(f"计划启动时间: {self.config.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append(_SEP70)
+        return "\n".join(lines)
+    
+    def _emit(self, level: str, message: str, *args, echo: bool = True):
+        """记录日志并按需回显到标准输出（替代 print + log 成对调用）
+        
+        Args:
+            level: 日志级别（info/warning/error）
+            message: 日志内容（% 风格占位符，日志被过滤时不做格式化）
+            *args: 格式化参数
+            echo: 是否回显到标准输出
+        """
+        getattr(self.log_manager, level)(message, *args)
+        if echo:
+            print(f"[{TimeUtils.now_hms()}] {message % args if args else message}")
+    
+    def print_banner(self):
+        """打印脚本信息横幅"""
+        print(self._banner_str)
+    
+    def shutdown(self):
+        """请求停止观测流程（中断时间等待和状态监控，可从信号处理器或其他线程调用）"""
+        self._shutdown.set()
+        self.time_manager.shutdown()
     
     def monitor_status(self):
         """监控观测状态（每30秒刷新）"""
         self.log_manager.info("开始状态监控（每30秒刷新）")
-        print(f"\n{'='*70}")
-        print("开始状态监控 - 按 Ctrl+C 退出监控")
-        print(f"{'='*70}\n")
+        print(f"\n{_SEP70}\n开始状态监控 - 按 Ctrl+C 退出监控\n{_SEP70}\n")
+        
+        interval = 30  # 刷新间隔（秒）
+        next_tick = time.monotonic()
+        
+        # 进入循环前确定 ACP 对象（优先 app 属性），循环内直接使用局部变量
+        if getattr(self.acp_manager, 'app', None):
+            acp = self.acp_manager.app
+        elif getattr(self.acp_manager, 'acp', None):
+            acp = self.acp_manager.acp
+        else:
+            acp = None
+        log_info = self.log_manager.info
+        last_state = None
         
         try:
             while True:
-                current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                # 以单调时钟固定刷新节拍，时间戳只在回显时格式化
+                next_tick += interval
                 
                 # 获取ACP状态
                 try:
-                    # 检查 acp_manager 是否有 app 属性
-                    if hasattr(self.acp_manager, 'app') and self.acp_manager.app:
-                        acp = self.acp_manager.app
-                    elif hasattr(self.acp_manager, 'acp') and self.acp_manager.acp:
-                        acp = self.acp_manager.acp
-                    else:
+                    if acp is None:
                         raise AttributeError("无法访问 ACP 对象")
                     
                     is_running = acp.IsRunning
-                    status_msg = f"[{current_time}] ACP状态: "
                     
                     if is_running:
-                        status_msg += "运行中 [OK]"
+                        state = "运行中 [OK]"
                         
                         # 尝试获取更多状态信息
                         try:
                             target_name = acp.TargetName
                             filter_name = acp.Filter
-                            status_msg += f" | 目标: {target_name} | 滤镜: {filter_name}"
+                            state += f" | 目标: {target_name} | 滤镜: {filter_name}"
                         except:
                             pass
                     else:
-                        status_msg += "已停止 [STOP]"
+                        state = "已停止 [STOP]"
                     
-                    print(status_msg)
-                    self.log_manager.info(status_msg)
+                    log_info("ACP状态: %s", state)
+                    # 非 verbose 模式下只在状态变化时回显，避免每个轮询节拍都写标准输出
+                    if self.verbose or state != last_state:
+                        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] ACP状态: {state}")
+                    last_state = state
                     
                 except Exception as e:
-                    error_msg = f"[{current_time}] 状态检测失败: {str(e)}"
-                    print(error_msg)
-                    self.log_manager.warning(error_msg)
+                    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] 状态检测失败: {e}")
+                    self.log_manager.warning("状态检测失败: %s", e)
+                    last_state = None
                 
-                # 等待30秒
-                time.sleep(30)
+                # 等待到下一个刷新节拍（扣除本轮状态查询耗时），收到停止请求时立即退出
+                if self._shutdown.wait(timeout=max(next_tick - time.monotonic(), 0)):
+                    self.log_manager.info("状态监控已停止")
+                    break
                 
         except KeyboardInterrupt:
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 用户中断状态监控")
+            print(f"\n[{TimeUtils.now_hms()}] 用户中断状态监控")
             self.log_manager.info("状态监控被用户中断")
     
     def run(self):
         """执行观测流程"""
         if self.config.dryrun:
-            self.log_manager.info("="*50)
+            self.log_manager.info(_SEP50)
             self.log_manager.info("启动 DRYRUN 模式 - 仅模拟运行")
-            self.log_manager.info("="*50)
+            self.log_manager.info(_SEP50)
         
         self.print_banner()
         
@@ -106,31 +156,44 @@ class ObservationOrchestrator:
         if not self.acp_manager.connect():
             return
         
-        # 停止当前计划（如果需要）
+        # 停止当前计划（如果需要），记录确认成功的时刻
+        stop_confirmed_at = None
         if self.config.stop_time:
-            self.time_manager.wait_until(self.config.stop_time, "停止")
-            self.log_manager.info(f"{'[DRYRUN] ' if self.config.dryrun else ''}到达停止时间，准备停止当前计划")
-            self.acp_manager.stop_script()
+            if not self.time_manager.wait_until(self.config.stop_time, "停止"):
+                self.log_manager.info("等待停止时间时收到关闭请求，退出")
+                return
+            self.log_manager.info("%s到达停止时间，准备停止当前计划", self._dryrun_prefix)
+            if self.acp_manager.stop_script():
+                stop_confirmed_at = time.monotonic()
         
         # 等待启动时间
-        self.time_manager.wait_until(self.config.start_time, "启动")
-        self.log_manager.info(f"{'[DRYRUN] ' if self.config.dryrun else ''}到达启动时间，开始执行{self.config.target_name}观测任务")
+        if not self.time_manager.wait_until(self.config.start_time, "启动"):
+            self.log_manager.info("等待启动时间时收到关闭请求，退出")
+            return
+        self.log_manager.info("%s到达启动时间，开始执行%s观测任务",
+                              self._dryrun_prefix, self.config.target_name)
         
-        # 启动前再次停止（确保干净启动）
-        self.acp_manager.stop_script(wait_seconds=5)
+        # 启动前再次停止（确保干净启动），在后台线程执行以便与计划构建重叠；
+        # 停止时间处刚确认停止且之后未发出其他命令时跳过
+        if stop_confirmed_at is not None and time.monotonic() - stop_confirmed_at < _STOP_REUSE_SECONDS:
+            self.log_manager.info("停止操作刚已确认，跳过启动前的再次停止")
+            plan = self.plan_builder.build()
+        else:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                stop_future = pool.submit(self.acp_manager.stop_script, wait_seconds=5)
+                plan = self.plan_builder.build()
+                stop_future.result()
         
-        # 创建并启动计划
-        plan = self.plan_builder.build()
+        # 启动计划
         self.acp_manager.start_imaging(plan)
         
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {'[DRYRUN] ' if self.config.dryrun else ''}观测计划已启动")
-        self.log_manager.info(f"{'[DRYRUN] ' if self.config.dryrun else ''}观测计划已启动")
+        self._emit('info', "%s观测计划已启动", self._dryrun_prefix)
         
         # 开始状态监控
         if not self.config.dryrun:
             self.monitor_status()
         else:
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 跳过状态监控")
+            print(f"\n[{TimeUtils.now_hms()}] [DRYRUN] 跳过状态监控")
         
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {'[DRYRUN] ' if self.config.dryrun else ''}脚本执行完成")
-        self.log_manager.info(f"{'[DRYRUN] ' if self.config.dryrun else ''}自动观测脚本执行完成")
\ No newline at end of file
+        print(f"\n[{TimeUtils.now_hms()}] {self._dryrun_prefix}脚本执行完成")
+        self.log_manager.info("%s自动观测脚本执行完成", self._dryrun_prefix)
\ No newline at end of file
@@ -1,33 +1,49 @@
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from datetime import datetime
 from .core.acp_client import ImagingPlan
+from .utils.time_utils import TimeUtils
 
 class ImagingPlanBuilder:
     """成像计划构建类"""
     def __init__(self, config):
         self.config = config
-    
-    def build(self):
-        """创建成像计划"""
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {'[DRYRUN] ' if self.config.dryrun else ''}正在创建成像计划...")
-        
-        filters = []
-        for filter_cfg in self.config.filters:
-            filters.append({
+        self._dryrun_prefix = '[DRYRUN] ' if config.dryrun else ''
+        # 配置在运行期间不变，滤镜参数在初始化时规范化一次，各次 build() 直接共用（计划只读取滤镜参数）
+        self._filters = [
+            {
                 'filter_id': filter_cfg['filter_id'],
                 'count': filter_cfg['count'],
                 'exposure': filter_cfg['exposure'],
                 'binning': filter_cfg.get('binning', 1)
-            })
+            }
+            for filter_cfg in config.filters
+        ]
+        self._detail_text = self._build_detail_text()
+    
+    def _build_detail_text(self) -> str:
+        """生成计划详情中除时间戳外的固定文本（配置不变，初始化时生成一次）"""
+        lines = [
+            f"  - 目标: {self.config.target_name}",
+            f"  - 坐标: {self.config.target_ra} / {self.config.target_dec}",
+            f"  - 滤镜数量: {len(self.config.filters)}",
+        ]
+        for i, filter_cfg in enumerate(self.config.filters, 1):
+            filter_name = filter_cfg.get('name') or f"Filter {filter_cfg['filter_id']}"
+            lines.append(f"    {i}. {filter_name}: {filter_cfg['exposure']}秒 x {filter_cfg['count']}张")
+        lines.append(f"  - 总图像: {self.config.get_total_images()}张")
+        lines.append(f"  - 抖动: {self.config.dither}像素")
+        lines.append(f"  - 自动对焦: {'是' if self.config.auto_focus else '否'}")
+        lines.append(f"  - 对焦间隔: {self.config.af_interval}分钟")
+        return "\n".join(lines)
+    
+    def build(self):
+        """创建成像计划"""
+        print(f"\n[{TimeUtils.now_hms()}] {self._dryrun_prefix}正在创建成像计划...")
         
         plan = ImagingPlan(
             target=self.config.target_name,
             ra=self.config.target_ra,
             dec=self.config.target_dec,
-            filters=filters,
+            filters=self._filters,
             dither=self.config.dither,
             auto_focus=self.config.auto_focus,
             periodic_af_interval=self.config.af_interval
@@ -38,15 +54,6 @@ class ImagingPlanBuilder:
     
     def _print_plan_details(self):
         """打印计划详情"""
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 成像计划详情:")
-        print(f"  - 目标: {self.config.target_name}")
-        print(f"  - 坐标: {self.config.target_ra} / {self.config.target_dec}")
-        print(f"  - 滤镜数量: {len(self.config.filters)}")
-        for i, filter_cfg in enumerate(self.config.filters, 1):
-            filter_name = filter_cfg.get('name', f"Filter {filter_cfg['filter_id']}")
-            print(f"    {i}. {filter_name}: {filter_cfg['exposure']}秒 x {filter_cfg['count']}张")
-        print(f"  - 总图像: {self.config.get_total_images()}张")
-        print(f"  - 抖动: {self.config.dither}像素")
-        print(f"  - 自动对焦: {'是' if self.config.auto_focus else '否'}")
-        print(f"  - 对焦间隔: {self.config.af_interval}分钟")
+        # 一次写出整个详情，只有时间戳需要现算
+        print(f"[{TimeUtils.now_hms()}] 成像计划详情:\n{self._detail_text}")
 
@@ -3,14 +3,11 @@
 负责目标观测时间的等待和调度管理
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, Optional, List
-import time
+import threading
 from ..utils.time_utils import TimeUtils
+from ..utils.observation_utils import ObservationUtils
 from ..utils.log_manager import LogManager
 
 
@@ -27,6 +24,21 @@ class TargetScheduler:
         self.log_manager = log_manager
         self.dryrun = dryrun
         self.waiting_target: Optional[Dict[str, Any]] = None
+        # 中断事件：interrupt() 置位后立即结束当前等待
+        self._interrupt_event = threading.Event()
+        # greedy_slew 策略的望远镜转动速度（度/秒），用于把角距离折算为时间代价
+        self.slew_rate_deg_s = 2.0
+    
+    def interrupt(self):
+        """中断当前的目标时间等待（可从其他线程调用）
+        
+        中断状态会一直保持，之后的等待也会立即返回，直到调用 reset()。
+        """
+        self._interrupt_event.set()
+    
+    def reset(self):
+        """清除中断状态（在新一轮观测开始时调用，不在每次等待时清除以免丢失中断请求）"""
+        self._interrupt_event.clear()
     
     def wait_for_target_time(self, target: Any, 
                            global_stop_time: Optional[datetime] = None) -> bool:
@@ -46,22 +58,22 @@ class TargetScheduler:
         
         # 检查是否已经过了目标时间
         if current_time >= target_time:
-            print(f"[{current_time.strftime('%H:%M:%S')}] 目标 {target_name} 时间已到，立即开始观测")
+            print(f"[{TimeUtils.now_hms()}] 目标 {target_name} 时间已到，立即开始观测")
             return True
         
         # 检查全局停止时间
         if global_stop_time and target_time >= global_stop_time:
-            print(f"[{current_time.strftime('%H:%M:%S')}] 目标 {target_name} 时间超过全局停止时间，跳过")
-            self.log_manager.info(f"目标 {target_name} 因超过全局停止时间而被跳过")
+            print(f"[{TimeUtils.now_hms()}] 目标 {target_name} 时间超过全局停止时间，跳过")
+            self.log_manager.info("目标 %s 因超过全局停止时间而被跳过", target_name)
             return False
         
         # 计算等待时间
         wait_seconds = (target_time - current_time).total_seconds()
         wait_hours = wait_seconds / 3600
         
-        print(f"\n[{current_time.strftime('%H:%M:%S')}] 等待目标 {target_name} 观测时间...")
-        print(f"  计划时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"  还需等待: {wait_hours:.1f}小时 ({wait_seconds/60:.0f}分钟)")
+        print(f"\n[{TimeUtils.now_hms()}] 等待目标 {target_name} 观测时间...\n"
+              f"  计划时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+              f"  还需等待: {wait_hours:.1f}小时 ({wait_seconds/60:.0f}分钟)")
         
         self.waiting_target = target
         
@@ -69,9 +81,9 @@ class TargetScheduler:
         success = self._wait_until_time(target_time, f"目标 {target_name}", global_stop_time)
         
         if success:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 到达 {target_name} 观测时间")
+            print(f"[{TimeUtils.now_hms()}] 到达 {target_name} 观测时间")
         else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 等待被中断")
+            print(f"[{TimeUtils.now_hms()}] 等待被中断")
         
         self.waiting_target = None
         return success
@@ -90,11 +102,12 @@ class TargetScheduler:
             False: 被中断
         """
         if self.dryrun:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 模拟等待 {description}...")
+            print(f"[{TimeUtils.now_hms()}] [DRYRUN] 模拟等待 {description}...")
             return True
         
-        check_interval = 30  # 30秒检查一次
+        wake_time = min(target_time, global_stop_time) if global_stop_time else target_time
         
+        # 一次性等待到目标时间（或全局停止时间），醒来后复核墙上时钟以应对时钟调整
         while True:
             current_time = datetime.now()
             
@@ -104,19 +117,12 @@ class TargetScheduler:
             
             # 检查全局停止时间
             if global_stop_time and current_time >= global_stop_time:
-                print(f"[{current_time.strftime('%H:%M:%S')}] 到达全局停止时间，中断等待")
+                print(f"[{TimeUtils.now_hms()}] 到达全局停止时间，中断等待")
                 return False
             
-            # 计算剩余时间
-            remaining_seconds = (target_time - current_time).total_seconds()
-            remaining_minutes = remaining_seconds / 60
-            
-            # 打印倒计时（每分钟一次）
-            if int(remaining_minutes) % 1 == 0:
-                print(f"[{current_time.strftime('%H:%M:%S')}] 等待 {description} 中... 剩余 {remaining_minutes:.0f}分钟")
-            
-            # 等待
-            time.sleep(min(check_interval, remaining_seconds))
+            # 等待（不超过全局停止时间）
+            if self._interrupt_event.wait(timeout=(wake_time - current_time).total_seconds()):
+                return False
     
     def get_current_waiting_target(self) -> Optional[Dict[str, Any]]:
         """获取当前正在等待的目标
@@ -143,15 +149,15 @@ class TargetScheduler:
         if current_time is None:
             current_time = datetime.now()
         
-        target_time = target.start_time
+        start_ts = target.start_timestamp
         
         # 检查是否已经过了目标时间太久（超过1小时）
-        if current_time > target_time + timedelta(hours=1):
+        if current_time.timestamp() - 3600 > start_ts:
             print(f"目标 {target.name} 已过期超过1小时，跳过")
             return True
         
         # 检查是否超过全局停止时间
-        if global_stop_time and target_time >= global_stop_time:
+        if global_stop_time and start_ts >= global_stop_time.timestamp():
             print(f"目标 {target.name} 时间超过全局停止时间，跳过")
             return True
         
@@ -171,31 +177,82 @@ class TargetScheduler:
         current_time = datetime.now()
         total_targets = len(targets)
         
-        # 分析目标状态
-        completed_targets = []
-        upcoming_targets = []
-        skipped_targets = []
+        # 分析目标状态（单次遍历，阈值预先换算为时间戳，循环内只做浮点比较）
+        now_ts = current_time.timestamp()
+        expire_ts = now_ts - 3600
+        stop_ts = global_stop_time.timestamp() if global_stop_time else float('inf')
+        completed_count = 0
+        upcoming_count = 0
+        skipped_count = 0
+        next_target = None
         
         for target in targets:
-            if self.should_skip_target(target, current_time, global_stop_time):
-                skipped_targets.append(target)
-            elif target.start_time <= current_time:
-                completed_targets.append(target)
+            start_ts = target.start_timestamp
+            if start_ts < expire_ts:
+                print(f"目标 {target.name} 已过期超过1小时，跳过")
+                skipped_count += 1
+            elif start_ts >= stop_ts:
+                print(f"目标 {target.name} 时间超过全局停止时间，跳过")
+                skipped_count += 1
+            elif start_ts <= now_ts:
+                completed_count += 1
             else:
-                upcoming_targets.append(target)
+                if next_target is None:
+                    next_target = target
+                upcoming_count += 1
         
         # 计算总观测时间
-        total_duration = sum(
-            sum(f['exposure'] * f['count'] for f in target.filters) 
-            for target in targets
-        ) / 3600  # 转换为小时
+        total_duration = sum(target.total_exposure_seconds for target in targets) / 3600  # 转换为小时
         
         return {
             'total_targets': total_targets,
-            'completed_targets': len(completed_targets),
-            'upcoming_targets': len(upcoming_targets),
-            'skipped_targets': len(skipped_targets),
+            'completed_targets': completed_count,
+            'upcoming_targets': upcoming_count,
+            'skipped_targets': skipped_count,
             'total_duration_hours': total_duration,
-            'next_target': upcoming_targets[0] if upcoming_targets else None,
+            'next_target': next_target,
             'current_time': current_time
-        }
\ No newline at end of file
+        }
+    
+    def select_next_target(self, candidates: List[Any], previous: Optional[Any] = None,
+                           current_time: Optional[datetime] = None) -> int:
+        """按 greedy_slew 策略选择下一个目标
+        
+        代价 = 从上一个目标转动所需时间 + 与目标开始时间的偏差（秒），选择代价最小者。
+        
+        Args:
+            candidates: 候选目标列表 (TargetConfig对象列表)
+            previous: 上一个观测的目标，为空时只按开始时间偏差选择
+            current_time: 当前时间（默认为now）
+            
+        Returns:
+            选中目标在 candidates 中的索引
+        """
+        if current_time is None:
+            current_time = datetime.now()
+        
+        prev_coord = None
+        if previous is not None:
+            try:
+                prev_coord = previous.coordinates_deg
+            except ValueError:
+                prev_coord = None
+        
+        best_index = 0
+        best_cost = None
+        for i, target in enumerate(candidates):
+            cost = abs((target.start_time - current_time).total_seconds())
+            if prev_coord is not None:
+                try:
+                    ra_deg, dec_deg = target.coordinates_deg
+                    separation = ObservationUtils.angular_separation(
+                        prev_coord[0], prev_coord[1], ra_deg, dec_deg
+                    )
+                    cost += separation / self.slew_rate_deg_s
+                except ValueError:
+                    pass
+            if best_cost is None or cost < best_cost:
+                best_index = i
+                best_cost = cost
+        
+        return best_index
@@ -1,33 +1,50 @@
 from datetime import datetime
+import threading
 import time
+from .utils.time_utils import TimeUtils
 
 class TimeManager:
     """时间管理类"""
     def __init__(self, dryrun=False):
         self.dryrun = dryrun
+        # 关闭事件：shutdown() 置位后立即结束当前等待
+        self._shutdown = threading.Event()
+    
+    def shutdown(self):
+        """中断当前及之后的等待（可从信号处理器或其他线程调用）"""
+        self._shutdown.set()
     
     def wait_until(self, target_time, action_name="执行"):
-        """等待到指定时间"""
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {'[DRYRUN] ' if self.dryrun else ''}等待到{action_name}时间...")
+        """等待到指定时间
+        
+        Returns:
+            True: 到达指定时间
+            False: 等待被 shutdown() 中断
+        """
+        print(f"\n[{TimeUtils.now_hms()}] {'[DRYRUN] ' if self.dryrun else ''}等待到{action_name}时间...")
         
         if self.dryrun:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [DRYRUN] 跳过等待，目标时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"[{TimeUtils.now_hms()}] [DRYRUN] 跳过等待，目标时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}")
             return True
         
-        while True:
-            now = datetime.now()
-            time_diff = (target_time - now).total_seconds()
-            
-            if time_diff <= 0:
-                break
-            
-            if int(time_diff) % 30 == 0:
-                hours = int(time_diff // 3600)
-                minutes = int((time_diff % 3600) // 60)
-                seconds = int(time_diff % 60)
-                print(f"[{now.strftime('%H:%M:%S')}] 距离{action_name}还有: {hours:02d}:{minutes:02d}:{seconds:02d}")
-            
-            time.sleep(1)
+        # 每30秒输出一次倒计时，其余时间直接睡到下一个输出点，避免每秒轮询
+        # 开始时把墙上时钟目标换算为单调时钟截止时间，之后不受 NTP 校时/夏令时跳变影响
+        deadline = time.monotonic() + max(0.0, (target_time - datetime.now()).total_seconds())
+        remaining = deadline - time.monotonic()
+        while remaining > 30:
+            hours = int(remaining // 3600)
+            minutes = int((remaining % 3600) // 60)
+            seconds = int(remaining % 60)
+            print(f"[{TimeUtils.now_hms()}] 距离{action_name}还有: {hours:02d}:{minutes:02d}:{seconds:02d}")
+            step = remaining % 30
+            if self._shutdown.wait(timeout=step if step >= 1 else step + 30):
+                print(f"\n[{TimeUtils.now_hms()}] 等待{action_name}时间被中断")
+                return False
+            remaining = deadline - time.monotonic()
+        
+        if remaining > 0 and self._shutdown.wait(timeout=remaining):
+            print(f"\n[{TimeUtils.now_hms()}] 等待{action_name}时间被中断")
+            return False
         
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ⏰ 到达{action_name}时间")
+        print(f"\n[{TimeUtils.now_hms()}] ⏰ 到达{action_name}时间")
         return True
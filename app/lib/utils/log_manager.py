@@ -5,21 +5,108 @@
 
 import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
+import atexit
 import logging
 import logging.handlers
+import queue
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
+from .time_utils import TimeUtils
+
+
+# 默认日志目录（项目根目录下的 logs），模块加载时计算一次
+_DEFAULT_LOG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'logs')
+
+
+class _CachedFormatter(logging.Formatter):
+    """按秒缓存时间戳字符串的格式化器（同一秒内的日志记录复用同一个 strftime 结果）"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (秒, 时间戳字符串)，整体替换以保证多线程下读取一致
+        self._cache = (None, '')
+        # 格式串固定，是否包含 %(asctime) 只需判断一次（基类每条记录都要做子串查找）
+        self._uses_time = super().usesTime()
+    
+    def usesTime(self) -> bool:
+        return self._uses_time
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        sec = int(record.created)
+        cached_sec, cached_str = self._cache
+        if sec != cached_sec:
+            cached_str = time.strftime(datefmt, self.converter(sec))
+            self._cache = (sec, cached_str)
+        return cached_str
+
+
+class _ThrottledRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """每隔若干条记录才检查一次文件大小的轮转处理器（避免每条记录都 seek/tell）
+    
+    文件大小最多可能超出 maxBytes 约 check_interval 条记录。
+    """
+    
+    check_interval = 64
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._records_since_check = 0
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        self._records_since_check += 1
+        if self._records_since_check < self.check_interval:
+            return False
+        self._records_since_check = 0
+        return super().shouldRollover(record)
+
+
+class _LogListener(logging.handlers.QueueListener):
+    """后台写文件日志的队列监听器（stop() 可重复调用）"""
+    
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+    
+    def drain(self):
+        """写出队列中已有的全部日志后继续监听"""
+        if self._thread is not None:
+            super().stop()
+            self.start()
+    
+    def close(self):
+        """停止监听并关闭其处理器"""
+        self.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+# 各日志器当前使用的后台写入监听器（日志器名 -> 监听器），重建或关闭时替换/移除
+_LISTENERS: Dict[str, _LogListener] = {}
+
+
+def _close_listeners():
+    """进程退出时关闭当前全部监听器，写出队列中剩余的日志"""
+    for listener in list(_LISTENERS.values()):
+        listener.close()
+    _LISTENERS.clear()
+
+
+# 只注册一次；logging 模块已先注册 shutdown，atexit 后注册先执行，保证在 logging.shutdown 之前写出
+atexit.register(_close_listeners)
+
 
 class LogManager:
     """日志管理器类"""
     
     def __init__(self, name: str = "ACPClient", log_dir: Optional[str] = None, 
                  log_level: str = "INFO", max_bytes: int = 10*1024*1024, 
-                 backup_count: int = 5, enable_console: bool = True):
+                 backup_count: int = 5, enable_console: bool = True,
+                 buffer_capacity: int = 32, async_file: bool = True):
         """初始化日志管理器
         
         Args:
@@ -29,42 +116,91 @@ class LogManager:
             max_bytes: 日志文件最大大小（字节）
             backup_count: 备份文件数量
             enable_console: 是否启用控制台输出
+            buffer_capacity: 文件日志缓冲条数（0 表示不缓冲；缓冲保持较小以免长时间等待期间日志滞留；WARNING 及以上级别立即写入，进程退出时自动写出）
+            async_file: 是否在后台线程写文件日志（调用方只做入队，不等待磁盘/网络盘写入）
         """
         self.name = name
-        self.log_dir = log_dir or os.path.join(os.path.dirname(__file__), '..', '..', '..', 'logs')
+        self.log_dir = log_dir or _DEFAULT_LOG_DIR
         self.log_level = getattr(logging, log_level.upper(), logging.INFO)
         self.max_bytes = max_bytes
         self.backup_count = backup_count
         self.enable_console = enable_console
-        
-        # 创建日志目录
-        Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+        self.buffer_capacity = buffer_capacity
+        self.async_file = async_file
+        self._log_dir_path = Path(self.log_dir)
+        self._log_file_prefix = f"{self.name}_"
+        # 日志文件列表缓存：目录 mtime 不变时直接复用
+        self._log_files_mtime: Optional[int] = None
+        self._log_files_cache: List[str] = []
         
         # 配置日志记录器
         self.logger = self._setup_logger()
+        
+        # 各级别日志方法直接绑定到底层 logger，省去一层 Python 包装调用
+        self.info = self.logger.info
+        self.debug = self.logger.debug
+        self.warning = self.logger.warning
+        self.error = self.logger.error
+        self.critical = self.logger.critical
+        self.exception = self.logger.exception
     
     def _setup_logger(self) -> logging.Logger:
         """设置日志记录器"""
         logger = logging.getLogger(self.name)
         logger.setLevel(self.log_level)
         
-        # 如果日志记录器已经有处理器，先清除它们
+        log_file = os.path.join(self.log_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d')}.log")
+        
+        # 同名日志记录器已按相同参数配置过时直接复用，避免重复打开日志文件和重建处理器
+        setup_key = (os.path.abspath(log_file), self.log_level, self.max_bytes,
+                     self.backup_count, self.enable_console, self.buffer_capacity, self.async_file)
+        if getattr(logger, '_acp_setup_key', None) == setup_key and logger.handlers:
+            return logger
+        
+        # 如果日志记录器已经有处理器，先关闭并清除它们（后台监听器先写出剩余日志）
+        listener = getattr(logger, '_acp_listener', None)
+        if listener is not None:
+            listener.close()
+            _LISTENERS.pop(logger.name, None)
+            logger._acp_listener = None
+        for handler in logger.handlers:
+            handler.close()
         logger.handlers.clear()
         
+        # 创建日志目录
+        Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+        
         # 创建格式化器
-        formatter = logging.Formatter(
+        formatter = _CachedFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
         # 文件处理器（轮转日志）
-        log_file = os.path.join(self.log_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = _ThrottledRotatingFileHandler(
             log_file, maxBytes=self.max_bytes, backupCount=self.backup_count
         )
         file_handler.setLevel(self.log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_target = file_handler
+        if self.buffer_capacity > 0:
+            # 缓冲文件日志，批量写入以减少磁盘I/O
+            file_target = logging.handlers.MemoryHandler(
+                self.buffer_capacity, flushLevel=logging.WARNING, target=file_handler
+            )
+            file_target.setLevel(self.log_level)
+        if self.async_file:
+            # 文件写入交给后台线程，调用方只需入队
+            log_queue = queue.SimpleQueue()
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            queue_handler.setLevel(self.log_level)
+            listener = _LogListener(log_queue, file_target, respect_handler_level=True)
+            listener.start()
+            _LISTENERS[logger.name] = listener
+            logger._acp_listener = listener
+            logger.addHandler(queue_handler)
+        else:
+            logger.addHandler(file_target)
         
         # 控制台处理器
         if self.enable_console:
@@ -79,31 +215,57 @@ class LogManager:
                     pass  # 如果reconfigure失败，使用默认编码
             logger.addHandler(console_handler)
         
+        logger._acp_setup_key = setup_key
         return logger
     
-    def info(self, message: str, **kwargs):
-        """记录信息日志"""
-        self.logger.info(message, **kwargs)
+    def flush(self):
+        """将缓冲中的日志立即写出"""
+        listener = getattr(self.logger, '_acp_listener', None)
+        if listener is not None:
+            listener.drain()
+            for handler in listener.handlers:
+                handler.flush()
+        for handler in self.logger.handlers:
+            handler.flush()
     
-    def debug(self, message: str, **kwargs):
-        """记录调试日志"""
-        self.logger.debug(message, **kwargs)
+    def close(self):
+        """写出剩余日志并停止后台写入线程（之后需重新创建 LogManager 才能继续写文件）"""
+        listener = getattr(self.logger, '_acp_listener', None)
+        if listener is not None:
+            listener.close()
+            _LISTENERS.pop(self.logger.name, None)
+            self.logger._acp_listener = None
+            self.logger._acp_setup_key = None
+        self.flush()
     
-    def warning(self, message: str, **kwargs):
-        """记录警告日志"""
-        self.logger.warning(message, **kwargs)
-    
-    def error(self, message: str, **kwargs):
-        """记录错误日志"""
-        self.logger.error(message, **kwargs)
-    
-    def critical(self, message: str, **kwargs):
-        """记录严重错误日志"""
-        self.logger.critical(message, **kwargs)
+    def isEnabledFor(self, level: int) -> bool:
+        """判断指定级别的日志是否会被记录（用于在构造日志内容前提前判断）
+        
+        Args:
+            level: logging 日志级别
+            
+        Returns:
+            是否会被记录
+        """
+        return self.logger.isEnabledFor(level)
     
-    def exception(self, message: str, **kwargs):
-        """记录异常日志"""
-        self.logger.exception(message, **kwargs)
+    def event(self, message: str, *args, level: str = 'info', echo: bool = True):
+        """记录事件日志并按需回显到标准输出（替代 print + log 成对调用）
+        
+        启用控制台处理器时日志本身已输出到控制台，不再重复回显。
+        message 支持 % 风格的延迟格式化参数，日志被过滤时不做格式化。
+        
+        Args:
+            message: 日志内容（可包含 % 占位符）
+            *args: 格式化参数
+            level: 日志级别（info/debug/warning/error/critical）
+            echo: 未启用控制台处理器时是否回显到标准输出
+        """
+        self.logger.log(getattr(logging, level.upper(), logging.INFO), message, *args)
+        if echo and not self.enable_console:
+            if args:
+                message = message % args
+            sys.stdout.write(f"[{TimeUtils.now_hms()}] {message}\n")
     
     def log_target_observation(self, target_name: str, ra: str, dec: str, 
                               observation_time: datetime, status: str, 
@@ -118,15 +280,17 @@ class LogManager:
             status: 观测状态
             details: 详细信息
         """
-        details_str = ""
-        if details:
-            details_str = f" - 详情: {details}"
-        
-        message = f"目标观测: {target_name} (RA: {ra}, DEC: {dec}) - " \
-                 f"时间: {observation_time.strftime('%Y-%m-%d %H:%M:%S')} - " \
-                 f"状态: {status}{details_str}"
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         
-        self.info(message)
+        if details:
+            self.info("目标观测: %s (RA: %s, DEC: %s) - 时间: %s - 状态: %s - 详情: %s",
+                      target_name, ra, dec, observation_time.strftime('%Y-%m-%d %H:%M:%S'),
+                      status, details)
+        else:
+            self.info("目标观测: %s (RA: %s, DEC: %s) - 时间: %s - 状态: %s",
+                      target_name, ra, dec, observation_time.strftime('%Y-%m-%d %H:%M:%S'),
+                      status)
     
     def log_meridian_flip(self, target_name: str, flip_time: datetime, 
                          before_side: str, after_side: str, success: bool):
@@ -139,14 +303,13 @@ class LogManager:
             after_side: 反转后天体侧
             success: 是否成功
         """
-        status = "成功" if success else "失败"
-        message = f"中天反转: {target_name} - 时间: {flip_time.strftime('%Y-%m-%d %H:%M:%S')} - " \
-                 f"从 {before_side} 到 {after_side} - {status}"
+        level = logging.INFO if success else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
         
-        if success:
-            self.info(message)
-        else:
-            self.error(message)
+        self.logger.log(level, "中天反转: %s - 时间: %s - 从 %s 到 %s - %s",
+                        target_name, flip_time.strftime('%Y-%m-%d %H:%M:%S'),
+                        before_side, after_side, "成功" if success else "失败")
     
     def log_schedule_summary(self, total_targets: int, observable_targets: int, 
                            start_time: datetime, end_time: datetime):
@@ -158,13 +321,14 @@ class LogManager:
             start_time: 开始时间
             end_time: 结束时间
         """
-        duration = (end_time - start_time).total_seconds() / 3600  # 小时
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         
-        message = f"观测调度摘要: 总目标 {total_targets} 个，可观测 {observable_targets} 个 - " \
-                 f"时间范围: {start_time.strftime('%Y-%m-%d %H:%M')} 到 " \
-                 f"{end_time.strftime('%Y-%m-%d %H:%M')} (持续 {duration:.1f} 小时)"
+        duration = (end_time - start_time).total_seconds() / 3600  # 小时
         
-        self.info(message)
+        self.info("观测调度摘要: 总目标 %d 个，可观测 %d 个 - 时间范围: %s 到 %s (持续 %.1f 小时)",
+                  total_targets, observable_targets, start_time.strftime('%Y-%m-%d %H:%M'),
+                  end_time.strftime('%Y-%m-%d %H:%M'), duration)
     
     def get_log_files(self) -> List[str]:
         """获取日志文件列表
@@ -172,14 +336,25 @@ class LogManager:
         Returns:
             日志文件路径列表
         """
-        log_files = []
-        log_dir_path = Path(self.log_dir)
+        try:
+            mtime = self._log_dir_path.stat().st_mtime_ns
+        except OSError:
+            return []
         
-        if log_dir_path.exists():
-            for log_file in log_dir_path.glob(f"{self.name}_*.log"):
-                log_files.append(str(log_file))
+        # 目录内容（文件创建/轮转）未变化时复用上次扫描结果
+        if mtime != self._log_files_mtime:
+            prefix = self._log_file_prefix
+            try:
+                with os.scandir(self._log_dir_path) as entries:
+                    self._log_files_cache = sorted(
+                        entry.path for entry in entries
+                        if entry.name.startswith(prefix) and entry.name.endswith('.log') and entry.is_file()
+                    )
+            except OSError:
+                return []
+            self._log_files_mtime = mtime
         
-        return sorted(log_files)
+        return list(self._log_files_cache)
     
     def get_recent_logs(self, lines: int = 50) -> List[str]:
         """获取最近的日志内容
@@ -197,10 +372,25 @@ class LogManager:
         # 获取最新的日志文件
         latest_log = log_files[-1]
         
+        if lines <= 0:
+            return []
+        
         try:
-            with open(latest_log, 'r', encoding='utf-8') as f:
-                all_lines = f.readlines()
-                return all_lines[-lines:] if len(all_lines) > lines else all_lines
+            # 从文件末尾按块向前读取，只读到包含所需行数为止，避免整个文件读入内存
+            with open(latest_log, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                pos = f.tell()
+                chunks = []
+                newline_count = 0
+                while pos > 0 and newline_count <= lines:
+                    read_size = min(8192, pos)
+                    pos -= read_size
+                    f.seek(pos)
+                    chunk = f.read(read_size)
+                    chunks.append(chunk)
+                    newline_count += chunk.count(b'\n')
+            data = b''.join(reversed(chunks))
+            return data.decode('utf-8', 'replace').splitlines(keepends=True)[-lines:]
         except Exception as e:
-            self.error(f"读取日志文件失败: {e}")
+            self.error("读取日志文件失败: %s", e)
             return []
\ No newline at end of file
@@ -3,10 +3,6 @@
 包含观测相关的工具函数和类
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
 import math
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
@@ -82,6 +78,28 @@ class ObservationUtils:
         
         return ra_str, dec_str
     
+    @staticmethod
+    def angular_separation(ra1_deg: float, dec1_deg: float,
+                           ra2_deg: float, dec2_deg: float) -> float:
+        """计算两个天体之间的角距离
+        
+        Args:
+            ra1_deg: 第一个天体RA度数
+            dec1_deg: 第一个天体DEC度数
+            ra2_deg: 第二个天体RA度数
+            dec2_deg: 第二个天体DEC度数
+            
+        Returns:
+            角距离（度）
+        """
+        # haversine 公式，小角度时数值稳定
+        dec1 = math.radians(dec1_deg)
+        dec2 = math.radians(dec2_deg)
+        sin_ddec = math.sin((dec2 - dec1) / 2)
+        sin_dra = math.sin(math.radians(ra2_deg - ra1_deg) / 2)
+        h = sin_ddec * sin_ddec + math.cos(dec1) * math.cos(dec2) * sin_dra * sin_dra
+        return math.degrees(2 * math.asin(min(1.0, math.sqrt(h))))
+    
     @staticmethod
     def calculate_airmass(altitude_deg: float) -> float:
         """计算大气质量
@@ -208,25 +226,51 @@ class ObservationUtils:
         Returns:
             可观测性信息字典
         """
+        return ObservationUtils.is_observable_batch(
+            [(ra_deg, dec_deg)], latitude_deg, min_altitude, max_airmass
+        )[0]
+    
+    @staticmethod
+    def is_observable_batch(coords: List[Tuple[float, float]], latitude_deg: float,
+                            min_altitude: float = 30.0, max_airmass: float = 2.0) -> List[Dict[str, Any]]:
+        """批量检查目标是否可观测（本地恒星时只计算一次）
+        
+        Args:
+            coords: (ra_deg, dec_deg) 元组列表
+            latitude_deg: 观测站纬度
+            min_altitude: 最小高度角（度）
+            max_airmass: 最大大气质量
+            
+        Returns:
+            可观测性信息字典列表，顺序与 coords 一致
+        """
         # 计算当前LST
         lst = ObservationUtils.calculate_lst(latitude_deg)
         
-        # 计算高度角和方位角
-        altitude, azimuth = ObservationUtils.calculate_altitude_azimuth(ra_deg, dec_deg, lst, latitude_deg)
-        
-        # 计算大气质量
-        airmass = ObservationUtils.calculate_airmass(altitude)
+        # 循环内使用的函数绑定为局部变量
+        calc_alt_az = ObservationUtils.calculate_altitude_azimuth
+        calc_airmass = ObservationUtils.calculate_airmass
         
-        # 判断可观测性
-        is_observable = altitude >= min_altitude and airmass <= max_airmass
+        results = []
+        for ra_deg, dec_deg in coords:
+            # 计算高度角和方位角
+            altitude, azimuth = calc_alt_az(ra_deg, dec_deg, lst, latitude_deg)
+            
+            # 计算大气质量
+            airmass = calc_airmass(altitude)
+            
+            # 判断可观测性
+            is_observable = altitude >= min_altitude and airmass <= max_airmass
+            
+            results.append({
+                'is_observable': is_observable,
+                'altitude': altitude,
+                'azimuth': azimuth,
+                'airmass': airmass,
+                'reason': '可观测' if is_observable else f"高度角{altitude:.1f}°太低或大气质量{airmass:.1f}太高"
+            })
         
-        return {
-            'is_observable': is_observable,
-            'altitude': altitude,
-            'azimuth': azimuth,
-            'airmass': airmass,
-            'reason': '可观测' if is_observable else f"高度角{altitude:.1f}°太低或大气质量{airmass:.1f}太高"
-        }
+        return results
     
     @staticmethod
     def calculate_observation_plan(targets: List[Dict[str, Any]], 
@@ -3,17 +3,32 @@
 包含时间相关的工具函数和类
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, Dict
 
 
+# now_hms 的缓存：(秒, 'HH:MM:SS')
+_hms_cache: Tuple[int, str] = (-1, '')
+
+
 class TimeUtils:
     """时间工具类"""
     
+    @staticmethod
+    def now_hms() -> str:
+        """获取当前时间的 HH:MM:SS 字符串（同一秒内复用，替代 datetime.now().strftime('%H:%M:%S')）
+        
+        Returns:
+            当前时间字符串
+        """
+        global _hms_cache
+        sec = int(time.time())
+        if sec != _hms_cache[0]:
+            t = time.localtime(sec)
+            _hms_cache = (sec, f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}")
+        return _hms_cache[1]
+    
     @staticmethod
     def parse_time_string(time_str: str, format_str: str = '%Y-%m-%d %H:%M:%S') -> Optional[datetime]:
         """解析时间字符串
@@ -131,7 +146,7 @@ class TimeUtils:
         
         Args:
             target_time: 目标时间
-            check_interval: 检查间隔（秒）
+            check_interval: 检查间隔（秒，已不再使用：直接睡到目标时间或超时时刻，保留以兼容旧调用）
             timeout: 超时时间
             
         Returns:
@@ -141,27 +156,22 @@ class TimeUtils:
         import time
         
         start_time = datetime.now()
+        deadline = start_time + timeout if timeout else None
+        wake_time = min(target_time, deadline) if deadline else target_time
         
+        # 一次性睡到目标时间（或超时时刻），醒来后复核墙上时钟以应对时钟调整
         while True:
             current_time = datetime.now()
             
-            # 检查超时
-            if timeout and current_time - start_time > timeout:
-                return False
-            
             # 检查是否到达目标时间
             if current_time >= target_time:
                 return True
             
-            # 计算剩余时间
-            remaining = target_time - current_time
-            
-            # 如果剩余时间小于检查间隔，直接等待剩余时间
-            if remaining.total_seconds() <= check_interval:
-                time.sleep(remaining.total_seconds())
-                return True
+            # 检查超时
+            if deadline and current_time >= deadline:
+                return False
             
-            time.sleep(check_interval)
+            time.sleep((wake_time - current_time).total_seconds())
     
     @staticmethod
     def get_current_time_info() -> Dict[str, str]:
@@ -8,11 +8,10 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import argparse
+import signal
 from datetime import datetime
 from pathlib import Path
 
-from lib.new_multi_target_orchestrator import NewMultiTargetOrchestrator
-
 
 def main():
     """主函数"""
@@ -39,12 +38,16 @@ def main():
             print(f"错误: 配置文件 {args.config} 不存在")
             return 1
         
-        # 创建协调器
+        # 创建协调器（参数解析后再导入，--help 和参数错误时不加载观测模块）
+        from lib.new_multi_target_orchestrator import NewMultiTargetOrchestrator
         orchestrator = NewMultiTargetOrchestrator(
             config_file=str(config_path),
             dry_run=args.dry_run
         )
         
+        # SIGTERM 时优雅停止：立即中断等待，不再开始新目标（Ctrl+C 仍用于跳过当前目标监控）
+        signal.signal(signal.SIGTERM, lambda signum, frame: orchestrator.shutdown())
+        
         # 验证模式
         if args.validate:
             print("\n=== 配置验证模式 ===")
@@ -82,26 +85,31 @@ def main():
             return 0
         
         # 正常运行模式
-        print(f"\n=== 多目标自动观测系统 v2.0 ===")
-        print(f"配置文件: {args.config}")
-        print(f"DRYRUN模式: {'是' if args.dry_run else '否'}")
-        print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"\n=== 多目标自动观测系统 v2.0 ===\n"
+              f"配置文件: {args.config}\n"
+              f"DRYRUN模式: {'是' if args.dry_run else '否'}\n"
+              f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # 运行观测序列
         results = orchestrator.run_observation_sequence()
         
         # 显示结果
-        print(f"\n=== 观测结果 ===")
-        print(f"总目标数: {len(results['target_results'])}")
-        print(f"成功: {results['completed_targets']}")
-        print(f"失败: {results['failed_targets']}")
-        print(f"整体状态: {'成功' if results['success'] else '失败'}")
+        lines = [
+            "\n=== 观测结果 ===",
+            f"总目标数: {len(results['target_results'])}",
+            f"成功: {results['completed_targets']}",
+            f"失败: {results['failed_targets']}",
+            f"整体状态: {'成功' if results['success'] else '失败'}",
+        ]
         
         if results['target_results']:
-            print(f"\n详细结果:")
+            lines.append("\n详细结果:")
             for result in results['target_results']:
                 status = "[OK]" if result['success'] else "[ERROR]"
-                print(f"{status} {result['target']}")
+                lines.append(f"{status} {result['target']}")
+        
+        # 一次写出整个结果
+        print("\n".join(lines))
         
         # 清理资源
         orchestrator.cleanup()
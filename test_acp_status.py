@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ACP状态查询测试
+验证 get_status 基于系统状态接口构建结果，并在最小轮询间隔内缓存、合并并发查询
+"""
+
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
+
+import pytest
+
+from lib.core.acp_connection_manager import ACPConnectionManager
+
+
+class FakeClient:
+    """模拟ACP客户端：记录系统状态请求次数，每次请求耗时 delay 秒"""
+
+    def __init__(self, owner='ACP Script', local_time='20:00:00', delay=0.0, error=None):
+        self.owner = owner
+        self.local_time = local_time
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_system_status(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(local_time=self.local_time, owner=self.owner,
+                               image_filter='L', plan_progress='1/3')
+
+
+def _manager(client):
+    manager = ACPConnectionManager('http://localhost:1/', 'u', 'p')
+    manager.client = client
+    manager.is_connected = True
+    return manager
+
+
+@pytest.mark.parametrize('owner, running', [('ACP Script', True), ('Free', False), (' free ', False)])
+def test_status_from_system_status(owner, running):
+    """运行状态由天文台占用者判断"""
+    status = _manager(FakeClient(owner=owner)).get_status()
+    assert status['connected'] is True
+    assert status['is_running'] is running
+    assert status['status'] == ('running' if running else 'idle')
+    assert status['filter'] == 'L'
+    assert 'error' not in status
+
+
+def test_default_status_reported_as_error():
+    """客户端返回默认状态（无本地时间）时视为查询失败"""
+    status = _manager(FakeClient(local_time='')).get_status()
+    assert 'error' in status
+    assert 'is_running' not in status
+
+
+def test_concurrent_calls_are_merged():
+    """并发查询只请求一次服务器，所有调用方得到相同结果"""
+    client = FakeClient(delay=0.2)
+    manager = _manager(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get_status())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls == 1
+    assert len(results) == 5
+    assert all(result == results[0] for result in results)
+
+
+def test_repeated_calls_cached_until_invalidated():
+    """最小轮询间隔内重复查询直接返回缓存，invalidate_status 后重新请求"""
+    client = FakeClient()
+    manager = _manager(client)
+    first = manager.get_status()
+    first['is_running'] = None  # 调用方修改返回值不影响缓存
+    assert manager.get_status()['is_running'] is True
+    assert client.calls == 1
+    manager.invalidate_status()
+    manager.get_status()
+    assert client.calls == 2
+
+
+def test_error_results_are_cached():
+    """查询出错的结果同样缓存，不会每次调用都请求服务器"""
+    client = FakeClient(error=RuntimeError('boom'))
+    manager = _manager(client)
+    assert manager.get_status()['error'] == 'boom'
+    assert manager.get_status()['error'] == 'boom'
+    assert client.calls == 1
+
+
+def test_cache_expires_after_min_poll_interval():
+    """超过最小轮询间隔后重新请求服务器"""
+    client = FakeClient()
+    manager = _manager(client)
+    manager.min_poll_interval_s = 0.05
+    manager.get_status()
+    time.sleep(0.1)
+    manager.get_status()
+    assert client.calls == 2
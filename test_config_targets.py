@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+多目标配置测试
+验证当前/下一个目标的查找边界，以及进程内解析缓存在各实例之间互不影响
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
+
+import pytest
+
+from lib.config import config_manager
+from lib.config.config_manager import MultiTargetConfigManager
+
+
+CONFIG_YAML = """\
+acp_server:
+  url: http://localhost:1/
+  username: u
+  password: p
+schedule:
+  stop_time: null
+targets:
+  - name: T1
+    ra: "04:01:07.51"
+    dec: "+36:31:11.9"
+    start_time: "2020-01-01 20:00:00"
+    filters:
+      - {filter_id: 0, name: L, exposure: 60, count: 2}
+  - name: T2
+    ra: "05:35:17.3"
+    dec: "-05:23:28"
+    start_time: "2020-01-01 21:00:00"
+    filters:
+      - {filter_id: 1, exposure: 30, count: 3}
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """写入包含两个目标（20:00、21:00）的配置文件"""
+    path = tmp_path / 'targets.yaml'
+    path.write_text(CONFIG_YAML, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def config(config_file):
+    return MultiTargetConfigManager(config_file)
+
+
+@pytest.mark.parametrize('now, current, upcoming', [
+    (datetime(2020, 1, 1, 19, 0), None, 'T1'),   # 第一个目标之前
+    (datetime(2020, 1, 1, 20, 0), 'T1', 'T2'),   # 恰好在第一个目标开始时刻
+    (datetime(2020, 1, 1, 20, 30), 'T1', 'T2'),  # 两个目标之间
+    (datetime(2020, 1, 1, 21, 0), 'T2', None),   # 恰好在最后一个目标开始时刻
+    (datetime(2020, 1, 1, 23, 0), 'T2', None),   # 最后一个目标之后
+])
+def test_current_and_next_target(config, now, current, upcoming):
+    """当前目标为开始时间不晚于当前时间的最后一个，下一个目标为第一个尚未开始的"""
+    current_target = config.get_current_target(now)
+    next_target = config.get_next_target(now)
+    assert (current_target.name if current_target else None) == current
+    assert (next_target.name if next_target else None) == upcoming
+
+
+def test_cached_instances_are_isolated(config_file):
+    """命中缓存的实例与首个实例不共享可变对象"""
+    first = MultiTargetConfigManager(config_file)
+    second = MultiTargetConfigManager(config_file)
+
+    assert second.targets is not first.targets
+    assert second.targets[0] is not first.targets[0]
+    assert second.raw_config is not first.raw_config
+
+    first.targets[0].name = 'changed'
+    first.targets.pop()
+    first.raw_config['targets'].clear()
+
+    third = MultiTargetConfigManager(config_file)
+    for manager in (second, third):
+        assert [t.name for t in manager.targets] == ['T1', 'T2']
+        assert len(manager.raw_config['targets']) == 2
+
+
+def test_cached_instance_keeps_target_identity(config_file):
+    """缓存快照整体复制，当前目标仍是 targets 列表中的同一对象"""
+    MultiTargetConfigManager(config_file)
+    cached = MultiTargetConfigManager(config_file)
+
+    assert cached.get_current_target(datetime(2020, 1, 1, 20, 30)) is cached.targets[0]
+
+
+def test_cache_keeps_one_entry_per_path(config_file):
+    """同一路径的配置文件修改后重新解析，缓存只保留最新一份"""
+    MultiTargetConfigManager(config_file)
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    MultiTargetConfigManager(config_file)
+
+    path = os.path.abspath(config_file)
+    assert sum(1 for key in config_manager._PARSED_CONFIGS if key == path) == 1
+    assert config_manager._PARSED_CONFIGS[path][0] == os.stat(config_file).st_mtime_ns
+
+
+def test_failed_reload_restores_parsed_fields(config, config_file):
+    """重新加载失败时全部解析字段保持原样"""
+    targets = config.targets
+    timed_targets = config._timed_targets
+
+    with open(config_file, 'w', encoding='utf-8') as f:
+        f.write("targets: [\n")
+    with pytest.raises(config_manager.ConfigValidationError):
+        config.reload()
+
+    assert config.targets is targets
+    assert config._timed_targets is timed_targets
+    assert config.get_next_target(datetime(2020, 1, 1, 19, 0)).name == 'T1'
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+中天时间计算测试
+验证恒星时按分钟缓存后，同一分钟内的中天时间计算结果保持一致
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
+
+from lib.meridian_flip_manager import MeridianFlipManager
+
+
+RA = '04:01:07.51'
+DEC = '+36:31:11.9'
+
+
+def test_meridian_time_stable_within_minute():
+    """同一分钟内两次计算得到相同的中天时间"""
+    manager = MeridianFlipManager()
+    first = manager.calculate_meridian_time(RA, DEC, datetime(2026, 10, 16, 20, 0, 0))
+    second = manager.calculate_meridian_time(RA, DEC, datetime(2026, 10, 16, 20, 0, 59, 999999))
+    assert first is not None
+    assert first == second
+
+
+def test_meridian_time_independent_of_cache_state():
+    """命中恒星时缓存与重新计算的结果一致"""
+    warm = MeridianFlipManager()
+    warm.calculate_meridian_time(RA, DEC, datetime(2026, 10, 16, 20, 0, 0))
+    cold = MeridianFlipManager()
+    observation_time = datetime(2026, 10, 16, 20, 0, 45)
+    assert (warm.calculate_meridian_time(RA, DEC, observation_time)
+            == cold.calculate_meridian_time(RA, DEC, observation_time))
+
+
+def test_batch_matches_single_calculation():
+    """批量计算与逐个计算的结果一致"""
+    manager = MeridianFlipManager()
+    observation_time = datetime(2026, 10, 16, 20, 0, 30)
+    batch = manager.calculate_meridian_times([RA, '05:35:17.3'], [DEC, '-05:23:28'], observation_time)
+    assert batch == [manager.calculate_meridian_time(RA, DEC, observation_time),
+                     manager.calculate_meridian_time('05:35:17.3', '-05:23:28', observation_time)]
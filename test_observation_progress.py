@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+观测进度测试
+验证观测进度按单调时钟秒数计算，不受墙上时钟调整影响
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
+
+import pytest
+
+from lib.core.acp_imaging_manager import ACPImagingManager
+from lib.execution.target_observation_executor import TargetObservationExecutor
+from lib.utils.log_manager import LogManager
+
+
+class FakeConnectionManager:
+    """返回固定状态的连接管理器"""
+
+    def get_status(self):
+        return {'connected': True, 'is_running': True}
+
+
+class FakeImagingManager:
+    """返回指定预计时长计划的成像管理器"""
+
+    def __init__(self, estimated_seconds):
+        self.estimated_seconds = estimated_seconds
+
+    def get_current_plan_status(self, acp_status=None):
+        return {'has_plan': True, 'plan': {'estimated_duration_seconds': self.estimated_seconds}}
+
+
+TARGET = SimpleNamespace(name='T1', enable_meridian_wait=False)
+
+
+def _executor(tmp_path, estimated_seconds):
+    log_manager = LogManager('TestProgress', log_dir=str(tmp_path), enable_console=False)
+    return TargetObservationExecutor(FakeConnectionManager(), FakeImagingManager(estimated_seconds), log_manager)
+
+
+def test_progress_from_monotonic_elapsed(tmp_path):
+    """进度 = 单调时钟已用秒数 / 预计秒数"""
+    executor = _executor(tmp_path, 120.0)
+    executor._observation_start_mono = time.monotonic() - 30
+    status = executor._get_observation_status(TARGET, datetime.now())
+    assert status['progress'] == pytest.approx(0.25, abs=0.01)
+    assert status['elapsed_seconds'] == pytest.approx(30, abs=1)
+    assert status['estimated_seconds'] == 120.0
+    assert status['elapsed_time'] == timedelta(seconds=status['elapsed_seconds'])
+    assert status['estimated_duration'] == timedelta(seconds=120)
+
+
+def test_progress_ignores_wall_clock(tmp_path):
+    """墙上时钟跳变（传入的当前时间）不影响进度"""
+    executor = _executor(tmp_path, 120.0)
+    executor._observation_start_mono = time.monotonic() - 30
+    status = executor._get_observation_status(TARGET, datetime.now() + timedelta(hours=5))
+    assert status['progress'] == pytest.approx(0.25, abs=0.01)
+
+
+@pytest.mark.parametrize('start_offset, estimated_seconds, expected', [
+    (None, 120.0, 0.0),   # 尚未开始尝试
+    (300, 120.0, 1.0),    # 超过预计时长时封顶
+    (30, 0.0, 1.0),       # 预计时长为0时视为完成
+])
+def test_progress_edge_cases(tmp_path, start_offset, estimated_seconds, expected):
+    executor = _executor(tmp_path, estimated_seconds)
+    if start_offset is not None:
+        executor._observation_start_mono = time.monotonic() - start_offset
+    status = executor._get_observation_status(TARGET, datetime.now())
+    assert status['progress'] == expected
+
+
+def test_plan_records_estimated_seconds():
+    """成像计划以浮点秒数记录预计时长（含20%缓冲）"""
+    manager = ACPImagingManager(FakeConnectionManager())
+    target = SimpleNamespace(name='T1', ra='04:01:07.51', dec='+36:31:11.9',
+                             filters=[{'filter_id': 0, 'exposure': 60, 'count': 2}])
+    plan = manager.create_imaging_plan(target, {})
+    assert plan['estimated_duration_seconds'] == pytest.approx(144.0)
+    assert isinstance(plan['estimated_duration_seconds'], float)
+    assert plan['estimated_duration'] == timedelta(seconds=144)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+等待中断语义测试
+验证调度器中断、中天反转取消在 reset() 之前保持有效，不会在等待中被清除而丢失
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
+
+import pytest
+
+from lib.scheduling.target_scheduler import TargetScheduler
+from lib.meridian_flip_manager import MeridianFlipManager
+from lib.utils.log_manager import LogManager
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    """非 DRYRUN 模式的调度器（真实等待）"""
+    log_manager = LogManager('TestScheduler', log_dir=str(tmp_path), enable_console=False)
+    return TargetScheduler(log_manager)
+
+
+@pytest.fixture
+def meridian_manager(monkeypatch):
+    """中天反转管理器，检查结果固定为需要等待 wait_seconds 秒"""
+    manager = MeridianFlipManager()
+    manager.wait_seconds = 0.5
+
+    def fake_check(ra, dec, current_time):
+        return {
+            'wait_needed': True,
+            'wait_until': datetime.now() + timedelta(seconds=manager.wait_seconds),
+            'status': 'test',
+            'message': '测试等待',
+        }
+
+    monkeypatch.setattr(manager, 'check_meridian_flip_needed', fake_check)
+    return manager
+
+
+def _future_target(seconds: float) -> SimpleNamespace:
+    """生成开始时间在 seconds 秒之后的目标"""
+    return SimpleNamespace(name='T', start_time=datetime.now() + timedelta(seconds=seconds))
+
+
+def test_scheduler_interrupt_ends_wait(scheduler):
+    """等待期间调用 interrupt() 立即结束等待"""
+    threading.Timer(0.1, scheduler.interrupt).start()
+    start = time.monotonic()
+    assert scheduler.wait_for_target_time(_future_target(30)) is False
+    assert time.monotonic() - start < 5
+
+
+def test_scheduler_interrupt_before_wait_is_not_lost(scheduler):
+    """等待开始前的中断请求不会丢失，后续每次等待都立即返回"""
+    scheduler.interrupt()
+    assert scheduler.wait_for_target_time(_future_target(30)) is False
+    assert scheduler.wait_for_target_time(_future_target(30)) is False
+
+
+def test_scheduler_reset_clears_interrupt(scheduler):
+    """reset() 之后等待正常进行到目标时间"""
+    scheduler.interrupt()
+    scheduler.reset()
+    assert scheduler.wait_for_target_time(_future_target(0.2)) is True
+
+
+def test_meridian_cancel_before_wait_is_not_lost(meridian_manager):
+    """等待开始前的取消请求不会丢失"""
+    meridian_manager.cancel()
+    start = time.monotonic()
+    assert meridian_manager.wait_for_meridian_flip('00:00:00', '+00:00:00', datetime.now()) is False
+    assert meridian_manager.wait_for_meridian_flip('00:00:00', '+00:00:00', datetime.now()) is False
+    assert time.monotonic() - start < 0.4
+
+
+def test_meridian_cancel_during_wait(meridian_manager):
+    """等待期间调用 cancel() 立即结束等待"""
+    meridian_manager.wait_seconds = 30
+    threading.Timer(0.1, meridian_manager.cancel).start()
+    start = time.monotonic()
+    assert meridian_manager.wait_for_meridian_flip('00:00:00', '+00:00:00', datetime.now()) is False
+    assert time.monotonic() - start < 5
+
+
+def test_meridian_cancel_with_external_stop_event(meridian_manager):
+    """传入外部停止事件时 cancel() 同样能结束等待"""
+    meridian_manager.wait_seconds = 30
+    stop_event = threading.Event()
+    threading.Timer(0.1, meridian_manager.cancel).start()
+    assert meridian_manager.wait_for_meridian_flip('00:00:00', '+00:00:00', datetime.now(),
+                                                   stop_event=stop_event) is False
+
+
+def test_meridian_reset_clears_cancel(meridian_manager):
+    """reset() 之后等待正常完成"""
+    meridian_manager.cancel()
+    meridian_manager.reset()
+    meridian_manager.wait_seconds = 0.2
+    assert meridian_manager.wait_for_meridian_flip('00:00:00', '+00:00:00', datetime.now()) is True